@@ -17,6 +17,7 @@ from service_flow.tablesession.models.table_session import TableSession
 from service_flow.order.models.order import Order
 from service_flow.orderitem.models.order_item import OrderItem
 from customer.models.customer import Customer
+from statistics.models.stat import DailyItemSales, DailyRevenue
 # Load environment variables
 load_dotenv()
 
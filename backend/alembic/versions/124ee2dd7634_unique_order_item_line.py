@@ -0,0 +1,66 @@
+"""unique order item line
+
+Revision ID: 124ee2dd7634
+Revises: c81a414766c7
+Create Date: 2026-10-18 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '124ee2dd7634'
+down_revision: Union[str, Sequence[str], None] = 'c81a414766c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Notes are compared trimmed, with blank meaning no note
+    op.execute("""
+        UPDATE orderitem
+        SET note = NULLIF(btrim(note), '')
+        WHERE note IS DISTINCT FROM NULLIF(btrim(note), '')
+    """)
+
+    # Fold duplicate lines into the oldest one so the unique index can be built
+    op.execute("""
+        WITH ranked AS (
+            SELECT
+                id,
+                min(id) OVER line AS keep_id,
+                sum(quantity) OVER line AS total_quantity,
+                count(*) OVER line AS copies
+            FROM orderitem
+            WINDOW line AS (PARTITION BY order_id, menu_item_id, coalesce(note, ''))
+        ),
+        merged AS (
+            UPDATE orderitem
+            SET quantity = ranked.total_quantity
+            FROM ranked
+            WHERE orderitem.id = ranked.id
+              AND ranked.id = ranked.keep_id
+              AND ranked.copies > 1
+        )
+        DELETE FROM orderitem
+        USING ranked
+        WHERE orderitem.id = ranked.id
+          AND ranked.id <> ranked.keep_id
+    """)
+
+    op.create_index(
+        'uq_orderitem_order_menu_item_note',
+        'orderitem',
+        ['order_id', 'menu_item_id', sa.text("coalesce(note, '')")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Merged lines stay merged
+    op.drop_index('uq_orderitem_order_menu_item_note', table_name='orderitem')
@@ -0,0 +1,83 @@
+"""session history index
+
+Revision ID: 3d13060df634
+Revises: d9c9ab36857c
+Create Date: 2026-10-18 03:20:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d13060df634'
+down_revision: Union[str, Sequence[str], None] = 'd9c9ab36857c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Closed sessions keep their table_id now, so deleting a table has to
+    # unlink its history. NOT VALID skips the scan under the ALTER's lock;
+    # VALIDATE runs after that commits, so it checks the rows without
+    # blocking writes.
+    op.drop_constraint('tablesession_table_id_fkey', 'tablesession', type_='foreignkey')
+    op.create_foreign_key(
+        'tablesession_table_id_fkey',
+        'tablesession',
+        'diningtable',
+        ['table_id'],
+        ['id'],
+        ondelete='SET NULL',
+        postgresql_not_valid=True,
+    )
+
+    # See d9c9ab36857c about CONCURRENTLY and INVALID indexes
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE tablesession VALIDATE CONSTRAINT tablesession_table_id_fkey')
+        op.create_index(
+            'ix_tablesession_history',
+            'tablesession',
+            ['ended_at', 'id'],
+            postgresql_include=['table_id', 'customer_id', 'final_bill', 'started_at'],
+            postgresql_where=sa.text('ended_at IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Every ended_at range query also filters on ended_at IS NOT NULL
+        op.drop_index(
+            'ix_tablesession_ended_at',
+            table_name='tablesession',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tablesession_ended_at',
+            'tablesession',
+            ['ended_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_tablesession_history',
+            table_name='tablesession',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_constraint('tablesession_table_id_fkey', 'tablesession', type_='foreignkey')
+    op.create_foreign_key(
+        'tablesession_table_id_fkey',
+        'tablesession',
+        'diningtable',
+        ['table_id'],
+        ['id'],
+    )
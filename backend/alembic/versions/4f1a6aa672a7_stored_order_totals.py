@@ -0,0 +1,51 @@
+"""stored order totals
+
+Revision ID: 4f1a6aa672a7
+Revises: e7d9d38d97c3
+Create Date: 2026-10-18 02:43:26.086560
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1a6aa672a7'
+down_revision: Union[str, Sequence[str], None] = 'e7d9d38d97c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('order', sa.Column('subtotal', sa.Float(), server_default='0', nullable=False))
+    op.add_column('tablesession', sa.Column('subtotal', sa.Float(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE "order"
+        SET subtotal = lines.total
+        FROM (
+            SELECT order_id, sum(price_at_time * quantity) AS total
+            FROM orderitem
+            GROUP BY order_id
+        ) AS lines
+        WHERE "order".id = lines.order_id
+    """)
+    op.execute("""
+        UPDATE tablesession
+        SET subtotal = orders.total
+        FROM (
+            SELECT session_id, sum(coalesce(final_total, subtotal)) AS total
+            FROM "order"
+            GROUP BY session_id
+        ) AS orders
+        WHERE tablesession.id = orders.session_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tablesession', 'subtotal')
+    op.drop_column('order', 'subtotal')
@@ -0,0 +1,53 @@
+"""item sales rollup
+
+Revision ID: 523e3ecd4e61
+Revises: b2c352d883d5
+Create Date: 2026-10-18 04:02:51.337120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '523e3ecd4e61'
+down_revision: Union[str, Sequence[str], None] = 'b2c352d883d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'dailyitemsales',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('menu_item_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['menu_item_id'], ['menuitem.id'], ),
+        sa.PrimaryKeyConstraint('day', 'menu_item_id'),
+    )
+    op.create_index(op.f('ix_dailyitemsales_menu_item_id'), 'dailyitemsales', ['menu_item_id'], unique=False)
+    # Days as the database session sees them; after setting RESTAURANT_TIMEZONE
+    # run scripts.rebuild_daily_revenue, which re-files both rollups
+    op.execute("""
+        INSERT INTO dailyitemsales (day, menu_item_id, quantity, revenue)
+        SELECT
+            date(s.ended_at),
+            orderitem.menu_item_id,
+            sum(orderitem.quantity),
+            sum(orderitem.price_at_time * orderitem.quantity)
+        FROM orderitem
+        JOIN "order" ON "order".id = orderitem.order_id
+        JOIN tablesession AS s ON s.id = "order".session_id
+        WHERE s.ended_at IS NOT NULL
+        GROUP BY date(s.ended_at), orderitem.menu_item_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_dailyitemsales_menu_item_id'), table_name='dailyitemsales')
+    op.drop_table('dailyitemsales')
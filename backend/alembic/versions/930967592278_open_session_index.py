@@ -0,0 +1,33 @@
+"""open session index
+
+Revision ID: 930967592278
+Revises: 4f1a6aa672a7
+Create Date: 2026-10-18 02:46:34.982880
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '930967592278'
+down_revision: Union[str, Sequence[str], None] = '4f1a6aa672a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tablesession_open_table',
+        'tablesession',
+        ['table_id'],
+        postgresql_where=sa.text('ended_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tablesession_open_table', table_name='tablesession')
@@ -0,0 +1,57 @@
+"""daily revenue rollup
+
+Revision ID: b2c352d883d5
+Revises: 3d13060df634
+Create Date: 2026-10-18 03:41:07.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2c352d883d5'
+down_revision: Union[str, Sequence[str], None] = '3d13060df634'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'dailyrevenue',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.Column('sessions', sa.Integer(), nullable=False),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.Column('items', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day'),
+    )
+    # Same aggregation as scripts/rebuild_daily_revenue
+    op.execute("""
+        INSERT INTO dailyrevenue (day, revenue, sessions, orders, items)
+        SELECT
+            date(s.ended_at),
+            sum(coalesce(s.final_bill, 0)),
+            count(s.id),
+            sum(coalesce(o.orders, 0)),
+            sum(coalesce(i.items, 0))
+        FROM tablesession AS s
+        LEFT JOIN (
+            SELECT session_id, count(id) AS orders FROM "order" GROUP BY session_id
+        ) AS o ON o.session_id = s.id
+        LEFT JOIN (
+            SELECT "order".session_id, sum(orderitem.quantity) AS items
+            FROM orderitem JOIN "order" ON "order".id = orderitem.order_id
+            GROUP BY "order".session_id
+        ) AS i ON i.session_id = s.id
+        WHERE s.ended_at IS NOT NULL
+        GROUP BY date(s.ended_at)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('dailyrevenue')
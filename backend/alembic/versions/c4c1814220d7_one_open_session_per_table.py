@@ -0,0 +1,56 @@
+"""one open session per table
+
+Revision ID: c4c1814220d7
+Revises: 930967592278
+Create Date: 2026-10-18 02:49:02.269634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4c1814220d7'
+down_revision: Union[str, Sequence[str], None] = '930967592278'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Which of two open sessions on a table is real can't be decided here
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT table_id, array_agg(id ORDER BY id)
+        FROM tablesession
+        WHERE ended_at IS NULL AND table_id IS NOT NULL
+        GROUP BY table_id
+        HAVING count(*) > 1
+    """)).all()
+    if duplicates:
+        listed = ", ".join(f"table {table_id}: sessions {ids}" for table_id, ids in duplicates)
+        raise RuntimeError(
+            f"Tables with more than one open session ({listed}); "
+            "close or delete the extra sessions and run the migration again"
+        )
+
+    op.drop_index('ix_tablesession_open_table', table_name='tablesession')
+    op.create_index(
+        'uq_tablesession_open_table',
+        'tablesession',
+        ['table_id'],
+        unique=True,
+        postgresql_where=sa.text('ended_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_tablesession_open_table', table_name='tablesession')
+    op.create_index(
+        'ix_tablesession_open_table',
+        'tablesession',
+        ['table_id'],
+        postgresql_where=sa.text('ended_at IS NULL'),
+    )
@@ -0,0 +1,53 @@
+"""service flow indexes
+
+Revision ID: d9c9ab36857c
+Revises: c4c1814220d7
+Create Date: 2026-10-18 02:50:31.061656
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9c9ab36857c'
+down_revision: Union[str, Sequence[str], None] = 'c4c1814220d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_tablesession_ended_at', 'tablesession', ['ended_at']),
+    ('ix_tablesession_customer_id', 'tablesession', ['customer_id']),
+    ('ix_order_session_id', 'order', ['session_id']),
+    ('ix_orderitem_menu_item_id', 'orderitem', ['menu_item_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction, but doesn't block writes
+    # while the index builds. A build that fails leaves an INVALID index
+    # behind; drop it before running the migration again.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,40 @@
+"""order queue indexes
+
+Revision ID: e7d9d38d97c3
+Revises: 124ee2dd7634
+Create Date: 2026-10-18 02:38:27.653930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7d9d38d97c3'
+down_revision: Union[str, Sequence[str], None] = '124ee2dd7634'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_order_pending_queue',
+        'order',
+        ['created_at', 'id'],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        'ix_order_served_queue',
+        'order',
+        ['served_at', 'id'],
+        postgresql_where=sa.text("status = 'SERVED'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_served_queue', table_name='order')
+    op.drop_index('ix_order_pending_queue', table_name='order')
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from database import init_db
+from monitoring.services.query_metrics import QueryCountMiddleware
 from routers import routers
 
 app = FastAPI()
@@ -18,6 +19,8 @@ origins = [
     "https://njseatery.vercel.app",
 ]
 
+app.add_middleware(QueryCountMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
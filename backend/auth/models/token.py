@@ -3,6 +3,7 @@ from sqlmodel import SQLModel
 class Token(SQLModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
 
 class TokenData(SQLModel):
     email: str
\ No newline at end of file
@@ -1,13 +1,21 @@
 from datetime import timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi import APIRouter, Depends, Form, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 
 from database import get_session
 from auth.models.token import Token
-from auth.services.auth_service import authenticate_user, create_access_token
+from auth.services.auth_service import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    STATELESS_AUTH,
+    authenticate_refresh_token,
+    authenticate_user,
+    build_token_claims,
+    create_access_token,
+    create_refresh_token,
+)
 
 
 router = APIRouter(
@@ -15,36 +23,53 @@ router = APIRouter(
     tags=["Auth"],
 )
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(
-    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+async def login_for_access_token(
     session: SessionDep,
+    grant_type: Annotated[str, Form()] = "password",
+    username: Annotated[str | None, Form()] = None,
+    password: Annotated[str | None, Form()] = None,
+    refresh_token: Annotated[str | None, Form()] = None,
 ):
-    user = authenticate_user(
-        form_data.username,
-        form_data.password,
-        session,
-    )
+    if grant_type == "refresh_token":
+        user = (
+            await run_in_threadpool(authenticate_refresh_token, refresh_token, session)
+            if refresh_token
+            else None
+        )
+        error_detail = "Invalid refresh token"
+    elif grant_type == "password":
+        user = (
+            await authenticate_user(username, password, session)
+            if username and password
+            else None
+        )
+        error_detail = "Incorrect email or password"
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported grant type",
+        )
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
+            detail=error_detail,
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token_expires = timedelta(minutes=1440)
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
     access_token = create_access_token(
-        data={"sub": user.email},
+        data=build_token_claims(user),
         expires_delta=access_token_expires,
     )
 
     return Token(
         access_token=access_token,
         token_type="bearer",
+        refresh_token=create_refresh_token(user) if STATELESS_AUTH else None,
     )
-
@@ -1,20 +1,24 @@
 from typing import Annotated
 from datetime import datetime, timedelta, timezone
+import time
 
 import jwt
 from jwt import PyJWTError
 
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
 
 from database import get_session
 
 from auth.models.token import TokenData
-from auth.utils.auth_utils import verify_password
+from auth.utils.auth_utils import get_password_hash_async, password_needs_rehash, verify_password_async
+from auth.utils.user_cache import cache_user, get_cached_user
+from auth.utils.token_revocation import is_token_revoked
 
 from user.models.user import User, UserRole
-from user.services.user_service import get_user_by_email
+from user.services.user_service import get_user_by_email, update_password_hash
 from dotenv import load_dotenv
 import os
 
@@ -24,23 +28,44 @@ load_dotenv()
 SECRET_KEY = os.getenv('JWT_SECRET_KEY')
 ALGORITHM = os.getenv('ALGORITHM')
 
+# Opt-in: sign id, role and active flag into the token so authorization
+# dependencies can answer without a database round-trip.
+STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', 'false').lower() == 'true'
+# Stateless tokens keep their role and active flag until they expire, so
+# their lifetime is capped however long ACCESS_TOKEN_EXPIRE_MINUTES is
+STATELESS_ACCESS_TOKEN_MAX_MINUTES = 15
+ACCESS_TOKEN_EXPIRE_MINUTES = int(
+    os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', '15' if STATELESS_AUTH else '1440')
+)
+if STATELESS_AUTH:
+    ACCESS_TOKEN_EXPIRE_MINUTES = min(ACCESS_TOKEN_EXPIRE_MINUTES, STATELESS_ACCESS_TOKEN_MAX_MINUTES)
+REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv('REFRESH_TOKEN_EXPIRE_MINUTES', '1440'))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
-def authenticate_user(
+async def authenticate_user(
     email: str,
     password: str,
     session: Session,  # ✅ plain Session
 ):
     
-    user = get_user_by_email(session, email)
+    user = await run_in_threadpool(get_user_by_email, session, email)
     if not user:
         return None
 
-    if not verify_password(password, user.password_hash):
+    # Hand the connection back to the pool while bcrypt runs
+    await run_in_threadpool(session.close)
+
+    if not await verify_password_async(password, user.password_hash):
         return None
 
+    # Transparently upgrade hashes made with an older cost factor
+    if password_needs_rehash(user.password_hash):
+        password_hash = await get_password_hash_async(password)
+        await run_in_threadpool(update_password_hash, session, user, password_hash)
+
     return user
 
 
@@ -64,6 +89,81 @@ def create_access_token(
         algorithm=ALGORITHM,
     )
 
+def build_token_claims(user: User) -> dict:
+    claims = {"sub": user.email}
+    if STATELESS_AUTH:
+        claims.update({
+            "uid": user.id,
+            "role": user.role.value,
+            "active": user.is_active,
+            "iat": time.time(),
+        })
+    return claims
+
+
+def create_refresh_token(user: User) -> str:
+    return create_access_token(
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "type": "refresh",
+            "iat": time.time(),
+        },
+        expires_delta=timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+def authenticate_refresh_token(
+    refresh_token: str,
+    session: Session,
+):
+    try:
+        payload = jwt.decode(
+            refresh_token,
+            SECRET_KEY,
+            algorithms=[ALGORITHM],
+        )
+    except PyJWTError:
+        return None
+
+    if payload.get("type") != "refresh":
+        return None
+
+    try:
+        revoked = is_token_revoked(int(payload["uid"]), float(payload["iat"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if revoked:
+        return None
+
+    user = get_user_by_email(session, payload["sub"])
+    if not user or not user.is_active:
+        return None
+
+    return user
+
+
+def _user_from_claims(payload: dict) -> User | None:
+    try:
+        user_id = int(payload["uid"])
+        issued_at = float(payload["iat"])
+        role = UserRole(payload["role"])
+        is_active = bool(payload["active"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if is_token_revoked(user_id, issued_at):
+        return None
+
+    return User(
+        id=user_id,
+        email=payload["sub"],
+        role=role,
+        is_active=is_active,
+    )
+
+
 def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     session: SessionDep,
@@ -81,7 +181,7 @@ def get_current_user(
             algorithms=[ALGORITHM],
         )
         email = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("type") == "refresh":
             raise credentials_exception
 
         token_data = TokenData(email=email)
@@ -89,9 +189,18 @@ def get_current_user(
     except PyJWTError:
         raise credentials_exception
 
-    user = get_user_by_email(session, token_data.email)
-    if not user:
-        raise credentials_exception
+    if STATELESS_AUTH:
+        user = _user_from_claims(payload)
+        if user is None:
+            raise credentials_exception
+        return user
+
+    user = get_cached_user(token_data.email)
+    if user is None:
+        user = get_user_by_email(session, token_data.email)
+        if not user:
+            raise credentials_exception
+        cache_user(user)
 
     return user
 
@@ -106,6 +215,22 @@ def get_current_active_user(
         )
     return current_user
 
+def get_current_user_profile(
+    session: SessionDep,
+    current_user: User = Depends(get_current_active_user),
+):
+    """Full user row; stateless tokens only carry id, role and active flag"""
+    if not STATELESS_AUTH:
+        return current_user
+
+    user = get_cached_user(current_user.email)
+    if user is None:
+        user = get_user_by_email(session, current_user.email)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        cache_user(user)
+    return user
+
 def require_role(*roles: UserRole):
     def checker(user: User = Depends(get_current_active_user)):
         print("USER ROLE:", user.role)
@@ -1,10 +1,66 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from bcrypt import hashpw, gensalt, checkpw
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+load_dotenv()
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt runs on its own small pool so a burst of logins queues here instead
+# of occupying the request threadpool that serves order entry.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+
+_password_pool = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_password_slots = threading.BoundedSemaphore(
+    PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT
+)
 
 def get_password_hash(password: str) -> str:
-    return hashpw(password.encode("utf-8"), gensalt()).decode("utf-8")
+    return hashpw(password.encode("utf-8"), gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
         return checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
     except ValueError:
-        return False
\ No newline at end of file
+        return False
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a different cost factor than configured"""
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+async def _run_in_password_pool(fn, *args):
+    if not _password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many logins in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        future = _password_pool.submit(fn, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+
+    # Release on completion, not on await, so cancelled requests still count
+    # against the queue until their hash has actually finished.
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_password_pool(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
@@ -0,0 +1,19 @@
+import threading
+import time
+
+# In-memory revocation table for stateless tokens: any token for a user that
+# was issued at or before the recorded time is rejected. It is per process, so
+# short access-token lifetimes bound how long another worker can lag behind.
+_lock = threading.Lock()
+_revoked_before: dict[int, float] = {}
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    with _lock:
+        _revoked_before[user_id] = time.time()
+
+
+def is_token_revoked(user_id: int, issued_at: float) -> bool:
+    with _lock:
+        cutoff = _revoked_before.get(user_id)
+    return cutoff is not None and issued_at <= cutoff
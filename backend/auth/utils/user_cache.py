@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from user.models.user import User
+
+load_dotenv()
+
+# Per-process cache of authenticated users, keyed by the token subject (email).
+# Entries are detached copies, so they never hold on to a request's session.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+_lock = threading.Lock()
+_entries: dict[str, tuple[float, User]] = {}
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def get_cached_user(email: str) -> User | None:
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(email)
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                del _entries[email]
+            _stats["misses"] += 1
+            return None
+        _stats["hits"] += 1
+        return entry[1]
+
+
+def cache_user(user: User) -> None:
+    if USER_CACHE_TTL_SECONDS <= 0:
+        return
+    detached = User(**user.model_dump())
+    with _lock:
+        _entries[user.email] = (time.monotonic() + USER_CACHE_TTL_SECONDS, detached)
+
+
+def invalidate_user(email: str) -> None:
+    with _lock:
+        if _entries.pop(email, None) is not None:
+            _stats["invalidations"] += 1
+
+
+def clear_user_cache() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def get_user_cache_stats() -> dict:
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "size": len(_entries),
+            "ttl_seconds": USER_CACHE_TTL_SECONDS,
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+        }
@@ -5,5 +5,6 @@ from service_flow.tablesession.models.table_session import TableSession
 from service_flow.order.models.order import Order
 from service_flow.orderitem.models.order_item import OrderItem
 from menu.models.menu_item import MenuItem
+from statistics.models.stat import DailyItemSales, DailyRevenue
 
 # nothing else here
@@ -0,0 +1,97 @@
+"""Latency and database round-trips of POST /order/{id}/items/bulk by batch size.
+
+    uvicorn app:app --port 8080
+    python benchmarks/bulk_items_bench.py --email admin@example.com --password secret
+
+For each batch size every request adds that many new lines (distinct notes) to
+an order on a scratch table, which is removed afterwards. Statement and commit
+counts come from /admin/monitoring/queries, so use an admin account. At least
+one menu item must exist.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+
+import httpx
+
+from common import Recorder, login, run_workers
+
+QUERIES_ENDPOINT = "POST /order/{order_id}/items/bulk"
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        headers = await login(client, args.email, args.password)
+
+        menu_items = (await client.get("/menu-items", headers=headers)).json()
+        if not menu_items:
+            raise SystemExit("Create at least one menu item first")
+
+        table_number = random.randint(100_000, 999_999)
+        (await client.post(
+            "/tables/add-table",
+            json={"number": table_number, "type": "indoor"},
+            headers=headers,
+        )).raise_for_status()
+        tables = (await client.get("/tables/", headers=headers)).json()
+        table_id = next(t["id"] for t in tables if t["number"] == table_number)
+        table_session = (await client.post(
+            "/table-sessions", json={"table_id": table_id}, headers=headers
+        )).json()
+        (await client.post(
+            f"/table-sessions/{table_session['id']}/orders", headers=headers
+        )).raise_for_status()
+        detail = (await client.get(
+            f"/table-sessions/{table_session['id']}", headers=headers
+        )).json()
+        order_id = detail["orders"][0]["id"]
+
+        counter = itertools.count()
+
+        try:
+            for size in args.sizes:
+                recorder = Recorder(f"{size} items")
+                await client.delete("/admin/monitoring/queries", headers=headers)
+
+                async def step():
+                    batch = next(counter)
+                    payload = [
+                        {
+                            "menu_item_id": random.choice(menu_items)["id"],
+                            "quantity": 1,
+                            "note": f"bench {batch}-{i}",
+                        }
+                        for i in range(size)
+                    ]
+                    await recorder.timed(client.post(
+                        f"/order/{order_id}/items/bulk", json=payload, headers=headers
+                    ))
+
+                started = time.perf_counter()
+                await run_workers(args.duration, args.concurrency, step)
+                elapsed = time.perf_counter() - started
+
+                stats = (await client.get("/admin/monitoring/queries", headers=headers)).json()
+                counts = stats.get(QUERIES_ENDPOINT)
+                round_trips = (
+                    f"  queries/req {counts['queries_per_request']:.1f}"
+                    f"  commits/req {counts['commits_per_request']:.1f}"
+                    if counts else ""
+                )
+                print(recorder.report(elapsed) + round_trips)
+        finally:
+            await client.delete(f"/table-sessions/{table_session['id']}", headers=headers)
+            await client.delete(f"/tables/{table_number}", headers=headers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,62 @@
+"""Shared helpers for the load benchmarks in this folder.
+
+The benchmarks talk HTTP to a running server (``uvicorn app:app``) so they
+measure the same stack the restaurant uses, including the threadpool.
+"""
+import asyncio
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> dict:
+    response = await client.post(
+        "/auth/token",
+        data={"username": email, "password": password},
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Recorder:
+    """Collects per-request latencies and status codes for one workload"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: list[float] = []
+        self.statuses: dict[int, int] = {}
+
+    async def timed(self, request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await request
+        self.latencies.append(time.perf_counter() - started)
+        self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+        return response
+
+    def report(self, elapsed: float) -> str:
+        count = len(self.latencies)
+        return (
+            f"{self.name:<18} {count / elapsed:>9.1f} req/s"
+            f"  p50 {percentile(self.latencies, 50) * 1000:>8.1f} ms"
+            f"  p99 {percentile(self.latencies, 99) * 1000:>8.1f} ms"
+            f"  statuses {dict(sorted(self.statuses.items()))}"
+        )
+
+
+async def run_workers(duration: float, concurrency: int, work) -> None:
+    """Run ``work()`` in ``concurrency`` loops until ``duration`` seconds pass"""
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await work()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
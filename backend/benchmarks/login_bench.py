@@ -0,0 +1,61 @@
+"""Logins/sec while the order queue is under concurrent load.
+
+Usage (server running with the target settings, users already created):
+
+    python benchmarks/login_bench.py --email waiter@example.com --password secret
+
+The order workload polls ``GET /order`` like the kitchen screen does. Run it
+once with the password pool settings you want to compare (PASSWORD_HASH_WORKERS,
+PASSWORD_HASH_QUEUE_LIMIT, BCRYPT_ROUNDS) and compare the order p99 with and
+without the login burst (``--login-concurrency 0``).
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from common import Recorder, login, run_workers
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        headers = await login(client, args.email, args.password)
+        logins = Recorder("login")
+        orders = Recorder("order queue")
+
+        async def do_login():
+            await logins.timed(client.post(
+                "/auth/token",
+                data={"username": args.email, "password": args.password},
+            ))
+
+        async def do_order_poll():
+            await orders.timed(client.get(
+                "/order",
+                params={"page": 1, "page_size": 10},
+                headers=headers,
+            ))
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            run_workers(args.duration, args.login_concurrency, do_login),
+            run_workers(args.duration, args.order_concurrency, do_order_poll),
+        )
+        elapsed = time.perf_counter() - started
+
+        print(f"{args.duration:.0f}s, {args.login_concurrency} login / {args.order_concurrency} order workers")
+        if logins.latencies:
+            print(logins.report(elapsed))
+        print(orders.report(elapsed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--login-concurrency", type=int, default=20)
+    parser.add_argument("--order-concurrency", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,100 @@
+"""Requests/sec and p99 latency of the hot service_flow routes.
+
+Start the server once per mode and run the same workload against each:
+
+    DB_ASYNC_ROUTES=false uvicorn app:app --port 8080
+    python benchmarks/service_flow_bench.py --email admin@example.com --password secret
+
+    DB_ASYNC_ROUTES=true uvicorn app:app --port 8080
+    python benchmarks/service_flow_bench.py --email admin@example.com --password secret
+
+The workload mixes the floor view, the kitchen queue, session detail reads and
+waiters adding items, on a scratch table that is removed afterwards. At least
+one menu item must exist.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from common import Recorder, login, run_workers
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        headers = await login(client, args.email, args.password)
+
+        menu_items = (await client.get("/menu-items", headers=headers)).json()
+        if not menu_items:
+            raise SystemExit("Create at least one menu item first")
+
+        table_number = random.randint(100_000, 999_999)
+        (await client.post(
+            "/tables/add-table",
+            json={"number": table_number, "type": "indoor"},
+            headers=headers,
+        )).raise_for_status()
+        tables = (await client.get("/tables/", headers=headers)).json()
+        table_id = next(t["id"] for t in tables if t["number"] == table_number)
+        table_session = (await client.post(
+            "/table-sessions", json={"table_id": table_id}, headers=headers
+        )).json()
+        (await client.post(
+            f"/table-sessions/{table_session['id']}/orders", headers=headers
+        )).raise_for_status()
+        detail = (await client.get(
+            f"/table-sessions/{table_session['id']}", headers=headers
+        )).json()
+        order_id = detail["orders"][0]["id"]
+
+        recorders = {
+            "GET /tables/": Recorder("GET /tables/"),
+            "GET /order": Recorder("GET /order"),
+            "GET session": Recorder("GET session"),
+            "POST item": Recorder("POST item"),
+        }
+
+        async def step():
+            name = random.choices(list(recorders), weights=[3, 3, 2, 2])[0]
+            recorder = recorders[name]
+            if name == "GET /tables/":
+                await recorder.timed(client.get("/tables/", headers=headers))
+            elif name == "GET /order":
+                await recorder.timed(client.get("/order", params={"page_size": 10}, headers=headers))
+            elif name == "GET session":
+                await recorder.timed(client.get(f"/table-sessions/{table_session['id']}", headers=headers))
+            else:
+                item = random.choice(menu_items)
+                await recorder.timed(client.post(
+                    f"/order/{order_id}/items",
+                    json={"menu_item_id": item["id"], "quantity": 1},
+                    headers=headers,
+                ))
+
+        try:
+            started = time.perf_counter()
+            await run_workers(args.duration, args.concurrency, step)
+            elapsed = time.perf_counter() - started
+        finally:
+            await client.delete(f"/table-sessions/{table_session['id']}", headers=headers)
+            await client.delete(f"/tables/{table_number}", headers=headers)
+
+        overall = Recorder("overall")
+        for recorder in recorders.values():
+            overall.latencies += recorder.latencies
+            for code, count in recorder.statuses.items():
+                overall.statuses[code] = overall.statuses.get(code, 0) + count
+            print(recorder.report(elapsed))
+        print(overall.report(elapsed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=32)
+    asyncio.run(main(parser.parse_args()))
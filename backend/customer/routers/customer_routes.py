@@ -10,7 +10,7 @@ from customer.services.customer_service import create_customer, get_customer_by_
 from database import get_session
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 router = APIRouter(
     prefix="/customer",
@@ -9,7 +9,7 @@ from customer.services.customer_service import get_customer_by_id
 from database import get_session
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 router = APIRouter(
     prefix="/admin/customer",
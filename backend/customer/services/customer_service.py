@@ -1,6 +1,7 @@
 from fastapi import HTTPException
 from sqlmodel import Session, select
 
+from database import commit_or_flush
 from customer.models.customer import Customer
 from customer.schemas.customer import CustomerCreate
 
@@ -28,6 +29,5 @@ def create_customer(session: Session, data: CustomerCreate) -> Customer:
     )
 
     session.add(customer)
-    session.commit()
-    session.refresh(customer)
+    commit_or_flush(session)
     return customer
\ No newline at end of file
@@ -1,18 +1,211 @@
 from dotenv import load_dotenv
+import json
 import os
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 import base
+from monitoring.services.query_metrics import instrument_engine
+from monitoring.services.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+    register_engine,
+)
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Optional replica for heavy reads (analytics, history, menu). Falls back to
+# the primary so routes can opt in unconditionally.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+
+# Pool sizing; defaults match SQLAlchemy's own
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+
+# Serve the hot service_flow routes from async handlers on an AsyncSession
+DB_ASYNC_ROUTES = os.getenv("DB_ASYNC_ROUTES", "false").lower() == "true"
+
+# One transaction per request: services flush, the session dependency commits
+# once at the end (or rolls back on error). Off restores commit-per-call.
+DB_UNIT_OF_WORK = os.getenv("DB_UNIT_OF_WORK", "true").lower() == "true"
+
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+def _async_url(url: str):
+    """Same database through asyncpg, which spells the libpq TLS options differently"""
+    parsed = make_url(url)
+    query = dict(parsed.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    query.pop("channel_binding", None)
+    return parsed.set(drivername="postgresql+asyncpg", query=query)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+ASYNC_READ_DATABASE_URL = (
+    os.getenv("ASYNC_READ_DATABASE_URL")
+    or (_async_url(READ_DATABASE_URL) if READ_DATABASE_URL else None)
+)
+
 # PostgreSQL engine (no connect_args needed)
-engine = create_engine(DATABASE_URL, echo=False)
+engine = create_engine(
+    DATABASE_URL,
+    echo=False,
+    poolclass=InstrumentedQueuePool,
+    **POOL_OPTIONS,
+)
+register_engine("primary", engine)
+instrument_engine(engine)
+
+read_engine = engine
+if READ_DATABASE_URL:
+    read_engine = create_engine(
+        READ_DATABASE_URL,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        **POOL_OPTIONS,
+    )
+    register_engine("read", read_engine)
+    instrument_engine(read_engine)
+
+# Async engines for the service_flow routes, built on first use so asyncpg is
+# only needed once DB_ASYNC_ROUTES is on
+_async_engines = {}
+
+def _create_async_engine(name: str, url):
+    async_engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        **POOL_OPTIONS,
+    )
+    register_engine(name, async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+def get_async_engine():
+    if "async" not in _async_engines:
+        _async_engines["async"] = _create_async_engine("async", ASYNC_DATABASE_URL)
+    return _async_engines["async"]
+
+def get_async_read_engine():
+    if not ASYNC_READ_DATABASE_URL:
+        return get_async_engine()
+    if "async_read" not in _async_engines:
+        _async_engines["async_read"] = _create_async_engine("async_read", ASYNC_READ_DATABASE_URL)
+    return _async_engines["async_read"]
 
 def init_db():
     SQLModel.metadata.create_all(engine)
 
+def commit_or_flush(session: Session):
+    """What services call instead of commit()"""
+    if session.info.get("unit_of_work"):
+        session.flush()
+        session.info["pending_commit"] = True
+    else:
+        session.commit()
+
+async def commit_or_flush_async(session: AsyncSession):
+    if session.info.get("unit_of_work"):
+        await session.flush()
+        session.info["pending_commit"] = True
+    else:
+        await session.commit()
+
+def estimated_count_statement(statement):
+    """Planner row estimate for ``statement`` instead of counting the whole history"""
+    compiled = statement.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True},
+    )
+    return text(f"EXPLAIN (FORMAT JSON) {compiled}")
+
+def estimated_rows(plan) -> int:
+    # psycopg2 decodes the JSON plan, asyncpg hands back the text
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def run_after_commit(session: Session | AsyncSession, callback):
+    """Defer a side effect (cache invalidation, notifications) until the data is committed"""
+    session.info.setdefault("after_commit", []).append(callback)
+
+# after_commit and after_rollback are also sent for SAVEPOINTs (begin_nested),
+# so callbacks only run or drop when the outermost transaction ends
+@event.listens_for(Session, "after_commit")
+def _note_outermost_commit(session):
+    if not session.in_nested_transaction():
+        session.info["committed"] = True
+
+@event.listens_for(Session, "after_transaction_end")
+def _run_after_commit_callbacks(session, transaction):
+    if transaction.parent is not None:
+        return
+    callbacks = session.info.pop("after_commit", [])
+    if session.info.pop("committed", False):
+        for callback in callbacks:
+            callback()
+
+# Routers depend on these with scope="function" so the commit happens before
+# the response is sent, and a failed commit still turns into an error response.
+# Loaded state survives the commit: generated keys come back through
+# INSERT ... RETURNING, so nothing needs a refresh() round-trip.
 def get_session():
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+    with Session(
+        engine,
+        expire_on_commit=False,
+        info={"unit_of_work": DB_UNIT_OF_WORK},
+    ) as session:
+        if not DB_UNIT_OF_WORK:
+            yield session
+            return
+
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        if session.info.pop("pending_commit", False):
+            session.commit()
+
+def get_read_session():
+    """For GET routes that tolerate replication lag; never write through it"""
+    with Session(read_engine) as session:
+        yield session
+
+async def get_async_session():
+    # Nothing can lazy-load after a commit in async code, so keep loaded state
+    async with AsyncSession(
+        get_async_engine(),
+        expire_on_commit=False,
+        info={"unit_of_work": DB_UNIT_OF_WORK},
+    ) as session:
+        if not DB_UNIT_OF_WORK:
+            yield session
+            return
+
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        if session.info.pop("pending_commit", False):
+            await session.commit()
+
+async def get_async_read_session():
+    async with AsyncSession(get_async_read_engine(), expire_on_commit=False) as session:
+        yield session
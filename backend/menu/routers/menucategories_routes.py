@@ -2,11 +2,11 @@ from typing import Annotated
 from fastapi import APIRouter, Depends
 from sqlmodel import Session, select
 
-from database import get_session
+from database import get_read_session
 from menu.models.menu_category import MenuCategory
 from auth.services.auth_service import get_current_active_user
 
-SessionDep = Annotated[Session, Depends(get_session)]
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
 
 router = APIRouter(
     prefix="/menu-categories",
@@ -17,7 +17,7 @@ router = APIRouter(
     response_model=list[MenuCategory],
     dependencies=[Depends(get_current_active_user)]
 )
-def read_menu_categories(session: SessionDep):
+def read_menu_categories(session: ReadSessionDep):
     return session.exec(
         select(MenuCategory)
         .order_by(MenuCategory.display_order)  # pyright: ignore
@@ -13,7 +13,7 @@ router = APIRouter(
     tags=["menu-categories"],
 )
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 @router.post("/",
     response_model=MenuCategory,
@@ -21,7 +21,7 @@ SessionDep = Annotated[Session, Depends(get_session)]
 )
 def create_menu_category(
     data: MenuCategoryCreate,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session, scope="function")
 ):
     return create_category(session, data)
 
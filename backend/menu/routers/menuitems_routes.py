@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends
 from sqlmodel import Session, select
 
 from auth.services.auth_service import get_current_active_user
-from database import get_session
+from database import get_read_session
 from menu.models.menu_item import MenuItem
 
 router = APIRouter(
@@ -11,14 +11,14 @@ router = APIRouter(
     tags=["menuitems"],
 )
 
-SessionDep = Annotated[Session, Depends(get_session)]
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
 
 @router.get(
     "",
     response_model=list[MenuItem],
     dependencies=[Depends(get_current_active_user)]
 )
-def read_menuitems(session: SessionDep):
+def read_menuitems(session: ReadSessionDep):
     return session.exec(
         select(MenuItem).order_by(MenuItem.display_order) # type: ignore
     ).all()
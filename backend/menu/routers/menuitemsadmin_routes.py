@@ -13,7 +13,7 @@ router = APIRouter(
     tags=["menuitems"],
 )
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 
 @router.post(
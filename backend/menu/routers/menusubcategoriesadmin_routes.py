@@ -13,7 +13,7 @@ router = APIRouter(
     tags=["menu-subcategories"],
 )
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 
 @router.post(
@@ -23,7 +23,7 @@ SessionDep = Annotated[Session, Depends(get_session)]
 )
 def create_menu_subcategory(
     data: MenuSubCategoryCreate,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session, scope="function")
 ):
     return create_subcategory(session, data)
     
@@ -1,8 +1,10 @@
 from sqlmodel import select, func, Session
 from fastapi import HTTPException
 
+from database import commit_or_flush
 from menu.models.menu_category import MenuCategory
 from menu.schemas.menu_category import MenuCategoryCreate, MenuCategoryUpdate
+from statistics.services.analytics_cache import invalidate_after_menu_change
 
 def create_category(session, data: MenuCategoryCreate):
     max_order = session.exec(
@@ -17,8 +19,8 @@ def create_category(session, data: MenuCategoryCreate):
     )
 
     session.add(category)
-    session.commit()
-    session.refresh(category)
+    invalidate_after_menu_change(session)
+    commit_or_flush(session)
 
     return category
     
@@ -40,10 +42,11 @@ def update_category(
         setattr(category, key, value)
 
     session.add(category)
-    session.commit()
-    session.refresh(category)
+    invalidate_after_menu_change(session)
+    commit_or_flush(session)
     return category
     
 def delete_menu_category_hard(session: Session, category: MenuCategory):
     session.delete(category)
-    session.commit()
\ No newline at end of file
+    invalidate_after_menu_change(session)
+    commit_or_flush(session)
\ No newline at end of file
@@ -1,9 +1,11 @@
 from sqlmodel import select, func, Session
 from fastapi import HTTPException
 
+from database import commit_or_flush
 from menu.models.menu_item import MenuItem
 from menu.schemas.menu_item import MenuItemCreate, MenuItemUpdate
 from menu.models.menu_subcategory import MenuSubCategory
+from statistics.services.analytics_cache import invalidate_after_menu_change
 
 
 
@@ -37,8 +39,8 @@ def create_menu_item(session, data: MenuItemCreate) -> MenuItem:
     )
 
     session.add(menu_item)
-    session.commit()
-    session.refresh(menu_item)
+    invalidate_after_menu_change(session)
+    commit_or_flush(session)
 
     return menu_item
 
@@ -60,10 +62,11 @@ def update_menuitem(
         setattr(item, key, value)
 
     session.add(item)
-    session.commit()
-    session.refresh(item)
+    invalidate_after_menu_change(session)
+    commit_or_flush(session)
     return item
     
 def delete_menu_item_hard(session: Session, item: MenuItem):
     session.delete(item)
-    session.commit()
\ No newline at end of file
+    invalidate_after_menu_change(session)
+    commit_or_flush(session)
\ No newline at end of file
@@ -1,7 +1,9 @@
 from sqlmodel import select, func, Session
 from fastapi import HTTPException
+from database import commit_or_flush
 from menu.models.menu_subcategory import MenuSubCategory
 from menu.schemas.menu_subcategory import MenuSubCategoryCreate, MenuSubCategoryUpdate
+from statistics.services.analytics_cache import invalidate_after_menu_change
 
 
 def create_subcategory(session, data: MenuSubCategoryCreate) -> MenuSubCategory:
@@ -18,8 +20,8 @@ def create_subcategory(session, data: MenuSubCategoryCreate) -> MenuSubCategory:
     )
 
     session.add(subcategory)
-    session.commit()
-    session.refresh(subcategory)
+    invalidate_after_menu_change(session)
+    commit_or_flush(session)
 
     return subcategory
 
@@ -41,10 +43,11 @@ def update_subcategory(
         setattr(subcategory, key, value)
 
     session.add(subcategory)
-    session.commit()
-    session.refresh(subcategory)
+    invalidate_after_menu_change(session)
+    commit_or_flush(session)
     return subcategory
     
 def delete_menu_subcategory_hard(session: Session, subcategory: MenuSubCategory):
     session.delete(subcategory)
-    session.commit()
\ No newline at end of file
+    invalidate_after_menu_change(session)
+    commit_or_flush(session)
\ No newline at end of file
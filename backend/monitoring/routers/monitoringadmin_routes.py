@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+
+from auth.services.auth_service import require_admin
+from monitoring.services.pool_metrics import get_pool_stats
+from monitoring.services.query_metrics import get_query_stats, reset_query_stats
+
+router = APIRouter(prefix="/admin/monitoring", tags=["monitoring"])
+
+@router.get(
+    "/db-pool",
+    dependencies=[Depends(require_admin)]
+)
+def read_db_pool_stats():
+    return get_pool_stats()
+
+@router.get(
+    "/queries",
+    dependencies=[Depends(require_admin)]
+)
+def read_query_stats():
+    return get_query_stats()
+
+@router.delete(
+    "/queries",
+    status_code=204,
+    dependencies=[Depends(require_admin)]
+)
+def clear_query_stats():
+    reset_query_stats()
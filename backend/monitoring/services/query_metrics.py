@@ -0,0 +1,81 @@
+import threading
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+
+# Statements and commits issued while handling the current request. The dict
+# is shared by reference, so threadpool workers that copy the context still
+# count into it.
+_current: ContextVar[dict | None] = ContextVar("request_query_counts", default=None)
+
+_lock = threading.Lock()
+_endpoints: dict[str, dict] = {}
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany):
+    counts = _current.get()
+    if counts is not None:
+        counts["queries"] += 1
+
+
+def _on_commit(conn):
+    counts = _current.get()
+    if counts is not None:
+        counts["commits"] += 1
+
+
+def instrument_engine(engine) -> None:
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    event.listen(engine, "commit", _on_commit)
+
+
+def _record(endpoint: str, counts: dict) -> None:
+    with _lock:
+        stats = _endpoints.setdefault(
+            endpoint,
+            {"requests": 0, "queries": 0, "commits": 0, "max_queries": 0},
+        )
+        stats["requests"] += 1
+        stats["queries"] += counts["queries"]
+        stats["commits"] += counts["commits"]
+        stats["max_queries"] = max(stats["max_queries"], counts["queries"])
+
+
+class QueryCountMiddleware:
+    """Attributes database round-trips and commits to the matched route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counts = {"queries": 0, "commits": 0}
+        token = _current.set(counts)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                _record(f"{scope['method']} {route.path}", counts)
+
+
+def get_query_stats() -> dict:
+    with _lock:
+        return {
+            endpoint: {
+                **stats,
+                "queries_per_request": stats["queries"] / stats["requests"],
+                "commits_per_request": stats["commits"] / stats["requests"],
+            }
+            for endpoint, stats in sorted(_endpoints.items())
+        }
+
+
+def reset_query_stats() -> None:
+    with _lock:
+        _endpoints.clear()
@@ -8,12 +8,22 @@ from menu.routers import (
 )
 from user.routers import user_routes, useradmin_routes
 from auth.routers import auth_routes
-from service_flow.diningtable.routers import diningtable_routes, diningtableadmin_routes
-from service_flow.tablesession.routers import tablesession_routes, tablesessionadmin_routes
-from service_flow.order.routers import order_routes
-from service_flow.orderitem.routers import orderitem_routes
-from statistics.routers import stat_routes
+from database import DB_ASYNC_ROUTES
+from service_flow.diningtable.routers import diningtable_routes, diningtable_async_routes, diningtableadmin_routes
+from service_flow.tablesession.routers import tablesession_routes, tablesession_async_routes, tablesessionadmin_routes
+from service_flow.order.routers import order_routes, order_async_routes
+from service_flow.orderitem.routers import orderitem_routes, orderitem_async_routes
+from statistics.routers import stat_routes, statadmin_routes
 from customer.routers import customer_routes, customeradmin_routes
+from monitoring.routers import monitoringadmin_routes
+
+# The hot service_flow routers come in sync and async flavours with identical
+# paths; DB_ASYNC_ROUTES picks which one is mounted.
+if DB_ASYNC_ROUTES:
+    diningtable_routes = diningtable_async_routes
+    tablesession_routes = tablesession_async_routes
+    order_routes = order_async_routes
+    orderitem_routes = orderitem_async_routes
 
 routers = [
     menuitems_routes,
@@ -32,6 +42,8 @@ routers = [
     order_routes,
     orderitem_routes,
     stat_routes,
+    statadmin_routes,
     customer_routes,
     customeradmin_routes,
+    monitoringadmin_routes,
 ]
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Check that the hot service_flow queries are planned as index lookups and not
+full scans of the growing tables:
+
+    python -m scripts.check_query_plans
+
+Seeds a realistic amount of history (--sessions closed sessions with their
+orders and item lines) into DATABASE_URL inside a transaction, ANALYZEs it,
+EXPLAINs each query as the services build it and rolls everything back. A
+sequential scan on tablesession, order or orderitem fails the check; exits 1
+when any query does, so it can run in CI after a schema or query change.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, col, select
+
+from database import engine
+from service_flow.diningtable.services.diningtable_service import floor_view_statement
+from service_flow.order.models.order import Order, OrderStatus
+from service_flow.order.services.order_service import (
+    orders_count_statement,
+    pending_queue_statement,
+    served_queue_statement,
+)
+from service_flow.orderitem.models.order_item import OrderItem
+from service_flow.tablesession.schemas.table_session import TableSessionHistoryFilter
+from service_flow.tablesession.services.tablesession_service import (
+    close_session_statement,
+    closed_sessions_count_statement,
+    closed_sessions_statement,
+    locked_session_orders_statement,
+    unserved_orders_exist_statement,
+)
+from statistics.services.stat_services import (
+    daily_revenue_statement,
+    live_occupancy_statement,
+    occupancy_statement,
+    revenue_buckets_statement,
+    revenue_heatmap_statement,
+    table_turnover_statement,
+    ticket_times_statement,
+)
+
+# Tables that grow with every service; the floor view may scan diningtable
+HOT_TABLES = {"tablesession", "order", "orderitem"}
+
+
+SEED = """
+WITH category AS (
+    INSERT INTO menucategory (name, display_order) VALUES ('Plan check', 0)
+    RETURNING id
+), items AS (
+    INSERT INTO menuitem (name, price, category_id, is_available, display_order)
+    SELECT 'Plan check ' || g, 100 + g, category.id, true, g
+    FROM category, generate_series(1, 50) AS g
+    RETURNING id
+), tables AS (
+    INSERT INTO diningtable (number, type)
+    SELECT 900000 + g, 'INDOOR' FROM generate_series(1, 40) AS g
+    RETURNING id
+), customers AS (
+    INSERT INTO customer (name, phone_number, visit_count, total_spent, customer_since)
+    SELECT 'Plan check ' || g, 'plan-check-' || g, 0, 0, now()
+    FROM generate_series(1, 2000) AS g
+    RETURNING id
+)
+SELECT
+    (SELECT array_agg(id) FROM items),
+    (SELECT array_agg(id) FROM tables),
+    (SELECT array_agg(id) FROM customers)
+"""
+
+
+def seed(session: Session, sessions: int):
+    item_ids, table_ids, customer_ids = session.exec(text(SEED)).one()  # type: ignore
+    params = {
+        "sessions": sessions,
+        "tables": table_ids,
+        "customers": customer_ids,
+        "items": item_ids,
+    }
+    # Two years of closed sessions, a couple of orders each and a few lines per order
+    session.exec(text("""
+        INSERT INTO tablesession (table_id, customer_id, started_at, ended_at, final_bill, subtotal)
+        SELECT
+            (:tables)[1 + g % cardinality(:tables)],
+            (:customers)[1 + g % cardinality(:customers)],
+            now() - interval '730 days' + g * (interval '730 days' / :sessions),
+            now() - interval '730 days' + g * (interval '730 days' / :sessions) + interval '45 minutes',
+            500,
+            500
+        FROM generate_series(1, :sessions) AS g
+    """), params=params)  # type: ignore
+    # Tonight's service: one open session per table
+    session.exec(text("""
+        INSERT INTO tablesession (table_id, started_at, subtotal)
+        SELECT id, now(), 0 FROM unnest(CAST(:tables AS integer[])) AS id
+    """), params=params)  # type: ignore
+    session.exec(text("""
+        INSERT INTO "order" (session_id, status, created_at, served_at, final_total, subtotal)
+        SELECT
+            s.id,
+            CASE WHEN s.ended_at IS NULL THEN 'PENDING' ELSE 'SERVED' END::orderstatus,
+            s.started_at + n * interval '5 minutes',
+            CASE WHEN s.ended_at IS NULL THEN NULL ELSE s.started_at + n * interval '5 minutes' + interval '15 minutes' END,
+            CASE WHEN s.ended_at IS NULL THEN NULL ELSE 250 END,
+            250
+        FROM tablesession AS s, generate_series(1, 2) AS n
+        WHERE s.table_id = ANY(:tables)
+    """), params=params)  # type: ignore
+    session.exec(text("""
+        INSERT INTO orderitem (order_id, menu_item_id, quantity, price_at_time)
+        SELECT o.id, (:items)[1 + (o.id * 7 + n) % cardinality(:items)], 1, 125
+        FROM "order" AS o
+        JOIN tablesession AS s ON s.id = o.session_id AND s.table_id = ANY(:tables),
+        generate_series(1, 2) AS n
+    """), params=params)  # type: ignore
+    session.exec(text("ANALYZE menucategory, menuitem, customer, diningtable, tablesession, \"order\", orderitem"))  # type: ignore
+
+    open_session_id = session.exec(text(
+        "SELECT id FROM tablesession WHERE table_id = :table AND ended_at IS NULL"
+    ), params={"table": table_ids[0]}).scalar_one()  # type: ignore
+    return table_ids[0], open_session_id
+
+
+def scans(plan: dict):
+    yield plan["Node Type"], plan.get("Relation Name"), plan.get("Index Name")
+    for child in plan.get("Plans", []):
+        yield from scans(child)
+
+
+def explain(statement):
+    compiled = statement.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True},
+    )
+    return text(f"EXPLAIN (FORMAT JSON) {compiled}")
+
+
+def check(session: Session, label: str, statement) -> bool:
+    plan = session.exec(explain(statement)).scalar_one()  # type: ignore
+    nodes = list(scans(plan[0]["Plan"]))
+    full_scans = [relation for node, relation, _ in nodes if node == "Seq Scan" and relation in HOT_TABLES]
+    indexes = sorted({index for _, _, index in nodes if index})
+
+    passed = not full_scans
+    detail = f"seq scan on {', '.join(full_scans)}" if full_scans else ", ".join(indexes) or "-"
+    print(f"{'ok  ' if passed else 'FAIL'} {label}: {detail}")
+    return passed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=30_000, help="closed sessions to seed")
+    args = parser.parse_args()
+
+    import app  # noqa: F401  (registers every model before the mappers configure)
+
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    with Session(engine) as session:
+        table_id, open_session_id = seed(session, args.sessions)
+
+        statements = {
+            "kitchen queue": pending_queue_statement().limit(20),
+            "served history": served_queue_statement().limit(20),
+            "pending count": orders_count_statement(OrderStatus.PENDING),
+            "session history": closed_sessions_statement(TableSessionHistoryFilter()).limit(11),
+            "table history": closed_sessions_statement(TableSessionHistoryFilter(table_id=table_id)).limit(11),
+            "history count": closed_sessions_count_statement(TableSessionHistoryFilter(ended_from=now - timedelta(days=30))),
+            "weekly revenue": daily_revenue_statement(now - timedelta(days=7), now),
+            "hourly revenue": revenue_buckets_statement(today - timedelta(days=7), today, "hour"),
+            "revenue heatmap": revenue_heatmap_statement(today - timedelta(days=28), today),
+            "ticket times by hour": ticket_times_statement(today - timedelta(days=7), today, "hour"),
+            "ticket times by table type": ticket_times_statement(today - timedelta(days=7), today, "table_type"),
+            "ticket times by category": ticket_times_statement(today - timedelta(days=7), today, "category"),
+            "table turnover": table_turnover_statement(today - timedelta(days=7), today, "table"),
+            "occupancy": occupancy_statement(today - timedelta(days=7), today + timedelta(days=1)),
+            "live occupancy": live_occupancy_statement(),
+            "floor view": floor_view_statement(),
+            "session orders": select(Order).where(col(Order.session_id) == open_session_id),
+            "order lines": select(OrderItem).where(col(OrderItem.order_id) == 1),
+            "lock session orders": locked_session_orders_statement(open_session_id),
+            "unserved orders": unserved_orders_exist_statement(open_session_id),
+            "close session": close_session_statement(open_session_id),
+        }
+        results = [check(session, label, statement) for label, statement in statements.items()]
+        session.rollback()
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
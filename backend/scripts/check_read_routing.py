@@ -0,0 +1,172 @@
+"""
+Check that replica-routed GET endpoints read from READ_DATABASE_URL while
+writes and read-your-writes endpoints stay on DATABASE_URL.
+
+Point the two URLs at two separate, NON-replicated scratch databases so a row
+written to only one of them shows which engine served the request:
+
+    createdb njs_primary && createdb njs_replica
+    DATABASE_URL=postgresql://.../njs_primary \\
+    READ_DATABASE_URL=postgresql://.../njs_replica \\
+    python -m scripts.check_read_routing
+
+Run it again with DB_ASYNC_ROUTES=true to cover the async handlers. Rows it
+creates are tagged with a random marker and removed afterwards.
+"""
+import sys
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, col, delete, select
+
+from database import DATABASE_URL, READ_DATABASE_URL, engine, read_engine
+from auth.utils.auth_utils import get_password_hash
+from menu.models.menu_category import MenuCategory
+from service_flow.diningtable.models.dining_table import DiningTable, TableType
+from service_flow.tablesession.models.table_session import TableSession
+from statistics.models.stat import DailyRevenue
+from user.models.user import User, UserRole
+
+
+def check(label: str, passed: bool):
+    print(f"{'ok  ' if passed else 'FAIL'} {label}")
+    return passed
+
+
+def main() -> int:
+    if not READ_DATABASE_URL or READ_DATABASE_URL == DATABASE_URL:
+        print("Set READ_DATABASE_URL to a second database different from DATABASE_URL")
+        return 2
+
+    from app import app
+
+    marker = f"routing-check-{uuid.uuid4().hex[:8]}"
+    email = f"{marker}@example.com"
+    password = uuid.uuid4().hex
+    replica_ended_at = datetime(2001, 2, 3, 12, tzinfo=timezone.utc)
+    replica_bill = 4242.0
+    # Revenue endpoints read the dailyrevenue rollup, so each side gets its own row
+    primary_bill = 2121.0
+
+    for eng in (engine, read_engine):
+        SQLModel.metadata.create_all(eng)
+
+    with Session(engine) as session:
+        session.add(User(
+            email=email,
+            first_name="Routing",
+            last_name="Check",
+            password_hash=get_password_hash(password),
+            role=UserRole.ADMIN,
+        ))
+        session.add(MenuCategory(name=f"{marker}-primary", display_order=0))
+        table = DiningTable(number=900000 + uuid.uuid4().int % 99999, type=TableType.INDOOR)
+        session.add(table)
+        session.add(DailyRevenue(day=replica_ended_at.date(), revenue=primary_bill, sessions=1))
+        session.commit()
+        table_id = table.id
+
+    with Session(read_engine) as session:
+        session.add(MenuCategory(name=f"{marker}-replica", display_order=0))
+        session.add(TableSession(
+            started_at=replica_ended_at,
+            ended_at=replica_ended_at,
+            final_bill=replica_bill,
+        ))
+        session.add(DailyRevenue(day=replica_ended_at.date(), revenue=replica_bill, sessions=1))
+        session.commit()
+
+    results = []
+    try:
+        with TestClient(app) as client:
+            token = client.post(
+                "/auth/token",
+                data={"username": email, "password": password},
+            ).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            names = {c["name"] for c in client.get("/menu-categories", headers=headers).json()}
+            results.append(check(
+                "GET /menu-categories reads the replica",
+                f"{marker}-replica" in names and f"{marker}-primary" not in names,
+            ))
+
+            day = replica_ended_at.date().isoformat()
+            revenue = client.get(
+                "/analytics/revenue/weekly",
+                params={"start_date": day, "end_date": day},
+                headers=headers,
+            ).json()
+            results.append(check(
+                "GET /analytics/revenue/weekly reads the replica",
+                revenue["total_revenue"] == replica_bill,
+            ))
+
+            with Session(read_engine) as session:
+                replica_total = session.exec(
+                    select(TableSession).where(col(TableSession.ended_at).is_not(None))
+                ).all()
+            history = client.get(
+                "/table-sessions/history/paginated",
+                params={"page": 1, "page_size": 100},
+                headers=headers,
+            ).json()
+            results.append(check(
+                "GET /table-sessions/history/paginated reads the replica",
+                history["total"] == len(replica_total)
+                and any(item["final_bill"] == replica_bill for item in history["items"]),
+            ))
+
+            created = client.post(
+                "/admin/menu-categories/",
+                json={"name": f"{marker}-written"},
+                headers=headers,
+            ).json()
+            with Session(engine) as session:
+                on_primary = session.get(MenuCategory, created["id"])
+            with Session(read_engine) as session:
+                on_replica = session.exec(
+                    select(MenuCategory).where(MenuCategory.name == f"{marker}-written")
+                ).first()
+            results.append(check(
+                "POST /admin/menu-categories/ writes to the primary",
+                on_primary is not None and on_replica is None,
+            ))
+
+            seated = client.post(
+                "/table-sessions",
+                json={"table_id": table_id},
+                headers=headers,
+            ).json()
+            order = client.post(f"/table-sessions/{seated['id']}/orders", headers=headers)
+            detail = client.get(f"/table-sessions/{seated['id']}", headers=headers)
+            results.append(check(
+                "GET /table-sessions/{id} after a write reads the primary",
+                order.status_code == 201
+                and detail.status_code == 200
+                and len(detail.json()["orders"]) == 1,
+            ))
+            client.delete(f"/table-sessions/{seated['id']}", headers=headers)
+    finally:
+        for eng in (engine, read_engine):
+            with Session(eng) as session:
+                session.exec(delete(MenuCategory).where(col(MenuCategory.name).startswith(marker)))
+                session.exec(delete(User).where(User.email == email))
+                session.exec(delete(TableSession).where(
+                    TableSession.ended_at == replica_ended_at,
+                    TableSession.final_bill == replica_bill,
+                ))
+                session.exec(delete(DailyRevenue).where(
+                    DailyRevenue.day == replica_ended_at.date(),
+                    col(DailyRevenue.revenue).in_([primary_bill, replica_bill]),
+                ))
+                if eng is engine:
+                    session.exec(delete(DiningTable).where(DiningTable.id == table_id))
+                session.commit()
+
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
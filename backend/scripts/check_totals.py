@@ -0,0 +1,99 @@
+"""
+Recompute order and table-session subtotals in SQL and report rows whose
+stored running total has drifted:
+
+    python -m scripts.check_totals          # report only
+    python -m scripts.check_totals --fix    # also overwrite the stored totals
+
+Orders are compared with the sum of their item lines; sessions with the sum
+of their orders' totals (final_total once served, subtotal before). Exits 1
+when drift was found, so it can run from cron or CI.
+"""
+import argparse
+import sys
+
+from sqlalchemy import func, update
+from sqlmodel import Session, col, select
+
+from database import engine
+from service_flow.order.models.order import Order
+from service_flow.orderitem.models.order_item import OrderItem
+from service_flow.tablesession.models.table_session import TableSession
+
+TOLERANCE = 0.005
+
+
+def order_drift_statement():
+    lines = (
+        select(
+            OrderItem.order_id,
+            func.sum(OrderItem.price_at_time * OrderItem.quantity).label("total"),
+        )
+        .group_by(col(OrderItem.order_id))
+        .subquery()
+    )
+    expected = func.coalesce(lines.c.total, 0)
+    return (
+        select(Order.id, Order.subtotal, expected)
+        .outerjoin(lines, lines.c.order_id == Order.id)
+        .where(func.abs(Order.subtotal - expected) > TOLERANCE)
+        .order_by(col(Order.id))
+    )
+
+
+def session_drift_statement():
+    orders = (
+        select(
+            Order.session_id,
+            func.sum(func.coalesce(Order.final_total, Order.subtotal)).label("total"),
+        )
+        .group_by(col(Order.session_id))
+        .subquery()
+    )
+    expected = func.coalesce(orders.c.total, 0)
+    return (
+        select(TableSession.id, TableSession.subtotal, expected)
+        .outerjoin(orders, orders.c.session_id == TableSession.id)
+        .where(func.abs(TableSession.subtotal - expected) > TOLERANCE)
+        .order_by(col(TableSession.id))
+    )
+
+
+def report(label: str, rows) -> None:
+    print(f"{label}: {len(rows)} drifted")
+    for id, stored, expected in rows[:20]:
+        print(f"  #{id}: stored {stored:.2f}, expected {expected:.2f}")
+    if len(rows) > 20:
+        print(f"  ... and {len(rows) - 20} more")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="overwrite drifted totals")
+    args = parser.parse_args()
+
+    import app  # noqa: F401  (registers every model before the mappers configure)
+
+    with Session(engine) as session:
+        orders = session.exec(order_drift_statement()).all()
+        report("orders", orders)
+        if args.fix:
+            for id, _, expected in orders:
+                session.exec(update(Order).where(col(Order.id) == id).values(subtotal=expected))
+            session.flush()
+
+        # Sessions are checked after order fixes, which they are summed from
+        sessions = session.exec(session_drift_statement()).all()
+        report("table sessions", sessions)
+        if args.fix:
+            for id, _, expected in sessions:
+                session.exec(
+                    update(TableSession).where(col(TableSession.id) == id).values(subtotal=expected)
+                )
+            session.commit()
+
+    return 1 if orders or sessions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
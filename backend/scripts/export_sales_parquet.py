@@ -0,0 +1,154 @@
+"""
+Write the sales fact table (one row per item line of a closed session) to
+Parquet, one directory per month the sessions closed in:
+
+    python -m scripts.export_sales_parquet --out exports/sales          # sessions closed since the last run
+    python -m scripts.export_sales_parquet --out exports/sales --full   # start over
+
+Needs pyarrow (uv sync --extra parquet). Rows come from a server-side cursor
+and go out a record batch at a time, so memory stays flat however much
+history there is. Each run adds month=YYYY-MM/part-<first session id>.parquet
+files and moves the watermark in <out>/_watermark.json to the last session
+written; the next run picks up after it. Sessions closed in the last
+--lag-minutes are left for the next run, so a close that was still
+committing can't slip behind the watermark. Rerunning from the same
+watermark overwrites the same files.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+
+from sqlmodel import Session, func, select
+
+from database import engine
+from statistics.services.stat_services import sales_facts_statement
+
+WATERMARK_FILE = "_watermark.json"
+
+
+def fact_schema(pa):
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("session_id", pa.int64()),
+        ("table_id", pa.int64()),
+        ("table_type", pa.string()),
+        ("customer_id", pa.int64()),
+        ("customer_name", pa.string()),
+        ("session_started_at", timestamp),
+        ("session_ended_at", timestamp),
+        ("order_id", pa.int64()),
+        ("ordered_at", timestamp),
+        ("served_at", timestamp),
+        ("line_id", pa.int64()),
+        ("menu_item_id", pa.int64()),
+        ("item_name", pa.string()),
+        ("category_id", pa.int64()),
+        ("category_name", pa.string()),
+        ("quantity", pa.int32()),
+        ("price_at_time", pa.float64()),
+        ("line_total", pa.float64()),
+    ])
+
+
+def read_watermark(out: Path) -> tuple[datetime, int] | None:
+    path = out / WATERMARK_FILE
+    if not path.exists():
+        return None
+    watermark = json.loads(path.read_text())
+    return datetime.fromisoformat(watermark["ended_at"]), watermark["session_id"]
+
+
+def write_watermark(out: Path, ended_at: datetime, session_id: int):
+    path = out / WATERMARK_FILE
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps({"ended_at": ended_at.isoformat(), "session_id": session_id}))
+    temporary.replace(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", type=Path, required=True, help="output directory")
+    parser.add_argument("--full", action="store_true", help="delete earlier files and export every session")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="rows per record batch")
+    parser.add_argument("--lag-minutes", type=float, default=5)
+    args = parser.parse_args()
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is not installed: uv sync --extra parquet", file=sys.stderr)
+        return 2
+
+    import app  # noqa: F401  (registers every model before the mappers configure)
+
+    out: Path = args.out
+    out.mkdir(parents=True, exist_ok=True)
+    if args.full:
+        for path in out.glob("month=*/part-*.parquet"):
+            path.unlink()
+        (out / WATERMARK_FILE).unlink(missing_ok=True)
+
+    schema = fact_schema(pa)
+    columns = schema.names
+    enum_columns = {columns.index("table_type")}
+
+    after = read_watermark(out)
+    writer = None
+    month = None
+    written: dict[str, int] = {}
+    last = None
+
+    with Session(engine) as session:
+        until = session.exec(select(func.now())).one() - timedelta(minutes=args.lag_minutes)
+        statement = sales_facts_statement(after, until).execution_options(yield_per=args.batch_size)
+        result = session.exec(statement)
+
+        try:
+            for rows in result.partitions():
+                # Rows arrive in close order, so each month is one run of rows
+                start = 0
+                while start < len(rows):
+                    end = start
+                    while end < len(rows) and rows[end][0] == rows[start][0]:
+                        end += 1
+
+                    if rows[start][0] != month:
+                        if writer is not None:
+                            writer.close()
+                        month = rows[start][0]
+                        directory = out / f"month={month}"
+                        directory.mkdir(exist_ok=True)
+                        writer = pq.ParquetWriter(directory / f"part-{rows[start][1]}.parquet", schema)
+
+                    values = list(zip(*(row[1:] for row in rows[start:end])))
+                    for index in enum_columns:
+                        values[index] = [v.value if isinstance(v, Enum) else v for v in values[index]]
+                    writer.write_batch(pa.record_batch(
+                        [pa.array(column, type=schema.field(i).type) for i, column in enumerate(values)],
+                        schema=schema,
+                    ))
+                    written[month] = written.get(month, 0) + end - start
+                    last = rows[end - 1]
+                    start = end
+        finally:
+            if writer is not None:
+                writer.close()
+
+    if last is None:
+        print("no sessions closed since the last export")
+        return 0
+
+    session_ended_at, session_id = last[columns.index("session_ended_at") + 1], last[1]
+    write_watermark(out, session_ended_at, session_id)
+    for month, count in written.items():
+        print(f"month={month}: {count} lines")
+    print(f"watermark: session {session_id} closed {session_ended_at.isoformat()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Recompute the daily revenue and item-sales rollups from the closed sessions:
+
+    python -m scripts.rebuild_daily_revenue                                 # every day
+    python -m scripts.rebuild_daily_revenue --from 2026-01-01 --to 2026-02-01
+
+Closing a session adds it to its day as part of the close, and deleting a
+closed session takes it out again, so this is only needed after editing
+history by hand, after changing RESTAURANT_TIMEZONE, or to check the
+rollups. Days in [--from, --to) are deleted and rebuilt in one transaction;
+the range is open-ended when omitted.
+"""
+import argparse
+import sys
+from datetime import date
+
+from sqlmodel import Session, col, func, select
+
+from database import engine
+from statistics.models.stat import DailyItemSales, DailyRevenue
+from statistics.services.stat_services import rebuild_daily_revenue_statements, rebuild_item_sales_statements
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="day after the last, YYYY-MM-DD")
+    args = parser.parse_args()
+
+    import app  # noqa: F401  (registers every model before the mappers configure)
+
+    with Session(engine) as session:
+        statements = (
+            rebuild_daily_revenue_statements(args.start, args.end)
+            + rebuild_item_sales_statements(args.start, args.end)
+        )
+        for statement in statements:
+            session.exec(statement)  # type: ignore
+        days, revenue = session.exec(
+            select(func.count(col(DailyRevenue.day)), func.coalesce(func.sum(DailyRevenue.revenue), 0))
+        ).one()
+        item_days, item_revenue = session.exec(
+            select(func.count(col(DailyItemSales.day)), func.coalesce(func.sum(DailyItemSales.revenue), 0))
+        ).one()
+        session.commit()
+
+    print(f"daily revenue rollup: {days} days, {revenue:.2f} total revenue")
+    print(f"item sales rollup: {item_days} item-days, {item_revenue:.2f} total revenue")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,24 +13,9 @@ class TableType(str, Enum):
 class DiningTable(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     number: int = Field(unique=True, index=True)
-    sessions: list["TableSession"] = Relationship(back_populates="table")
-    type: TableType
-    
-    @property
-    def active_session(self) -> "TableSession | None":
-        return next(
-            (s for s in self.sessions if s.ended_at is None),
-            None
-        )
-    
-    @property
-    def is_occupied(self) -> bool:
-        return self.active_session is not None
-    
-    @property
-    def active_customer_name(self) -> str | None:
-        """Get the customer name from the active session"""
-        session = self.active_session
-        if session and session.customer:
-            return session.customer.name
-        return None
\ No newline at end of file
+    # The database unlinks the history (ON DELETE SET NULL) without loading it
+    sessions: list["TableSession"] = Relationship(
+        back_populates="table",
+        passive_deletes=True,
+    )
+    type: TableType
\ No newline at end of file
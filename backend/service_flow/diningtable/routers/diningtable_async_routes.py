@@ -0,0 +1,59 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+from auth.services.auth_service import get_current_active_user
+from database import get_async_session
+
+from service_flow.diningtable.schemas.dining_table import DiningTableCreate, DiningTableRead
+from service_flow.diningtable.services.diningtable_service import floor_view_statement, to_table_read
+from service_flow.diningtable.services.diningtable_async_service import create_table, delete_diningtable_hard, get_table_by_number
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session, scope="function")]
+
+router = APIRouter(prefix="/tables", tags=["tables"])
+
+@router.get(
+    "/",
+    response_model=list[DiningTableRead],
+    dependencies=[Depends(get_current_active_user)]
+)
+async def get_tables(session: AsyncSessionDep):
+    tables = (await session.exec(floor_view_statement())).all()
+    return [to_table_read(t) for t in tables]
+    
+@router.post(
+    "/add-table",
+    response_model=DiningTableCreate,
+    status_code=201,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def creating_table(table_in: DiningTableCreate, session: AsyncSessionDep):
+    if await get_table_by_number(session, table_in.number):
+        raise HTTPException(
+            status_code=400,
+            detail="table already exists"
+        )
+
+    return await create_table(
+        session,
+        table_in
+    )
+    
+@router.delete(
+    "/{table_number}",
+    status_code=204,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def delete_table(
+    table_number: int,
+    session: AsyncSessionDep,
+):
+    table = await get_table_by_number(session, table_number)
+
+    if not table:
+        raise HTTPException(status_code=404, detail="table not found")
+
+    await delete_diningtable_hard(session, table)
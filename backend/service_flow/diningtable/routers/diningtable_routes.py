@@ -1,20 +1,17 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
+from sqlmodel import Session
 
 
 from auth.services.auth_service import get_current_active_user
 from database import get_session
 
 from service_flow.diningtable.schemas.dining_table import DiningTableCreate, DiningTableRead
-from service_flow.diningtable.models.dining_table import DiningTable
-from service_flow.diningtable.services.diningtable_service import create_table, delete_diningtable_hard, get_table_by_number
-from service_flow.tablesession.models.table_session import TableSession
+from service_flow.diningtable.services.diningtable_service import create_table, delete_diningtable_hard, get_table_by_number, floor_view_statement, to_table_read
 
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 router = APIRouter(prefix="/tables", tags=["tables"])
 
@@ -24,30 +21,8 @@ router = APIRouter(prefix="/tables", tags=["tables"])
     dependencies=[Depends(get_current_active_user)]
 )
 def get_tables(session: SessionDep):
-    tables = session.exec(
-        select(DiningTable)
-        .options(
-            selectinload(DiningTable.sessions)  # type:ignore
-            .selectinload(TableSession.customer)  # type:ignore
-        )
-        .order_by(DiningTable.number) # type:ignore
-    ).all()
-    
-    result = []
-    for t in tables:
-        s = t.active_session
-        result.append(
-            DiningTableRead(
-                id=t.id,  # type: ignore
-                number=t.number,
-                type=t.type,
-                is_occupied=t.is_occupied,
-                active_session_id=s.id if s else None,
-                customer_name=t.active_customer_name,  # Using property
-                customer_arrival=s.started_at if s else None,  # Original logic
-            )
-        )
-    return result
+    tables = session.exec(floor_view_statement()).all()
+    return [to_table_read(t) for t in tables]
     
 @router.post(
     "/add-table",
@@ -10,7 +10,7 @@ from service_flow.diningtable.schemas.dining_table import DiningTableCreate
 from service_flow.diningtable.services.diningtable_service import create_table, delete_diningtable_hard, get_table_by_number
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 router = APIRouter(prefix="/admin/tables", tags=["tables"])
 
@@ -0,0 +1,30 @@
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import commit_or_flush_async
+from service_flow.diningtable.models.dining_table import DiningTable
+from service_flow.diningtable.schemas.dining_table import DiningTableCreate
+from statistics.services.analytics_cache import invalidate_after_table_change
+
+
+async def get_table_by_number(session: AsyncSession, number: int):
+    result = await session.exec(
+        select(DiningTable).where(DiningTable.number == number)
+    )
+    return result.first()
+    
+async def create_table(session: AsyncSession, data: DiningTableCreate) -> DiningTable:
+    table = DiningTable(
+        number=data.number,
+        type=data.type
+    )
+
+    session.add(table)
+    invalidate_after_table_change(session)
+    await commit_or_flush_async(session)
+    return table
+
+async def delete_diningtable_hard(session: AsyncSession, table: DiningTable):
+    await session.delete(table)
+    invalidate_after_table_change(session)
+    await commit_or_flush_async(session)
@@ -1,7 +1,11 @@
-from sqlmodel import select, Session
+from sqlmodel import Session, col, select
 
+from customer.models.customer import Customer
+from database import commit_or_flush
 from service_flow.diningtable.models.dining_table import DiningTable
-from service_flow.diningtable.schemas.dining_table import DiningTableCreate
+from service_flow.diningtable.schemas.dining_table import DiningTableCreate, DiningTableRead
+from service_flow.tablesession.models.table_session import TableSession
+from statistics.services.analytics_cache import invalidate_after_table_change
 
 
 def get_table_by_number(session: Session, number: int):
@@ -9,6 +13,40 @@ def get_table_by_number(session: Session, number: int):
         select(DiningTable).where(DiningTable.number == number)
     ).first()
     
+def floor_view_statement():
+    """
+    One row per table with its open session and customer, if any. The join
+    only touches open sessions (partial index), so history doesn't add cost.
+    """
+    return (
+        select(
+            DiningTable.id,
+            DiningTable.number,
+            DiningTable.type,
+            col(TableSession.id).label("active_session_id"),
+            col(Customer.name).label("customer_name"),
+            col(TableSession.started_at).label("customer_arrival"),
+        )
+        .outerjoin(
+            TableSession,
+            (col(TableSession.table_id) == DiningTable.id)
+            & col(TableSession.ended_at).is_(None),
+        )
+        .outerjoin(Customer, col(Customer.id) == TableSession.customer_id)
+        .order_by(col(DiningTable.number))
+    )
+
+def to_table_read(row) -> DiningTableRead:
+    return DiningTableRead(
+        id=row.id,
+        number=row.number,
+        type=row.type,
+        is_occupied=row.active_session_id is not None,
+        active_session_id=row.active_session_id,
+        customer_name=row.customer_name,
+        customer_arrival=row.customer_arrival,
+    )
+    
 def create_table(session: Session, data: DiningTableCreate) -> DiningTable:
 
     # 3. create user
@@ -18,10 +56,11 @@ def create_table(session: Session, data: DiningTableCreate) -> DiningTable:
     )
 
     session.add(table)
-    session.commit()
-    session.refresh(table)
+    invalidate_after_table_change(session)
+    commit_or_flush(session)
     return table
 
 def delete_diningtable_hard(session: Session, table: DiningTable):
     session.delete(table)
-    session.commit()
\ No newline at end of file
+    invalidate_after_table_change(session)
+    commit_or_flush(session)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from sqlalchemy import Index, text
 from sqlmodel import Column, DateTime, Field, Relationship, SQLModel
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
@@ -12,9 +13,26 @@ class OrderStatus(str, Enum):
     SERVED = "served"     # Delivered to table
 
 class Order(SQLModel, table=True):
+    __table_args__ = (
+        # Keyset pagination of the GET /order queue, one index per status bucket
+        Index(
+            "ix_order_pending_queue",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        Index(
+            "ix_order_served_queue",
+            "served_at",
+            "id",
+            postgresql_where=text("status = 'SERVED'"),
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     session_id: int = Field(
         foreign_key="tablesession.id",
+        index=True,
     )
     status: OrderStatus = Field(default=OrderStatus.PENDING)
     
@@ -28,6 +46,8 @@ class Order(SQLModel, table=True):
         default=None,
     )
     final_total: float | None = None
+    # Running sum of the item lines, kept up to date by the order item services
+    subtotal: float = Field(default=0, sa_column_kwargs={"server_default": "0"})
     
     # Relationships
     session: "TableSession" = Relationship(back_populates="orders")
@@ -41,14 +61,14 @@ class Order(SQLModel, table=True):
         """Use stored value if served, calculate if pending"""
         if self.final_total is not None:
             return self.final_total
-        return sum(item.line_total for item in self.items)
+        return self.subtotal
     
     def toggle_served(self):
         """Finalize the order"""
         if self.status == OrderStatus.PENDING:
             self.status = OrderStatus.SERVED
             self.served_at = datetime.now(timezone.utc)
-            self.final_total = sum(item.line_total for item in self.items)
+            self.final_total = self.subtotal
         else:
             self.status = OrderStatus.PENDING
             self.served_at = None
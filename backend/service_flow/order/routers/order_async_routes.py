@@ -0,0 +1,136 @@
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from auth.services.auth_service import get_current_active_user
+from database import estimated_rows, get_async_session
+from service_flow.order.models.order import Order, OrderStatus
+from service_flow.order.schemas.order import OrderRead
+from service_flow.order.services.order_events import last_event_id, order_event_stream
+from service_flow.order.services.order_service import (
+    keyset_queue_statements,
+    orders_count_statement,
+    orders_estimated_count_statement,
+    orders_queue_statement,
+    pending_queue_statement,
+    to_orders_page,
+)
+from service_flow.order.services.order_async_service import delete_order_hard, get_order_by_id, toggle_order_status
+from service_flow.orderitem.schemas.order_item import OrderItemCreate
+from service_flow.orderitem.services.orderitem_async_services import create_order_item, create_order_items_bulk
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session, scope="function")]
+
+router = APIRouter(prefix="/order", tags=["order"])
+
+@router.get(
+    "/stream",
+    dependencies=[Depends(get_current_active_user)]
+)
+async def stream_orders(session: AsyncSessionDep):
+    """Kitchen feed: the pending queue, then order and item events as server-sent events"""
+    since = last_event_id()
+    orders = (await session.exec(pending_queue_statement())).all()
+    snapshot = [OrderRead.model_validate(order) for order in orders]
+    # The session is closed before streaming starts; the feed holds no connection
+    return StreamingResponse(
+        order_event_stream(snapshot, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post(
+    "/{order_id}/items",
+    status_code=201,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def create_order_item_route(
+    order_id: int,
+    order_item_in: OrderItemCreate,
+    session: AsyncSessionDep,
+):
+    return await create_order_item(
+        session,
+        order_item_in,
+        order_id
+    )
+
+@router.post(
+    "/{order_id}/items/bulk",
+    status_code=201,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def create_order_items_bulk_route(
+    order_id: int,
+    order_items_in: list[OrderItemCreate],
+    session: AsyncSessionDep,
+):
+    return await create_order_items_bulk(session, order_items_in, order_id)
+    
+@router.delete(
+    "/{id}",
+    status_code=204,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def delete_order(
+    id: int,
+    session: AsyncSessionDep,
+):
+    order = await get_order_by_id(session, id)
+
+    if not order:
+        raise HTTPException(status_code=404, detail="order not found")
+
+    await delete_order_hard(session, order)
+    
+@router.patch(
+    "/{order_id}/toggle-status",
+    response_model=Order,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def patch_order(
+    order_id: int,
+    session: AsyncSessionDep,
+):
+    order = await get_order_by_id(session, order_id)
+
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    return await toggle_order_status(session, order)
+
+@router.get(
+    "",
+    response_model=dict,  # Changed to return paginated response
+    dependencies=[Depends(get_current_active_user)]
+)
+async def read_orders(
+    session: AsyncSessionDep,
+    page: int = Query(1, ge=1, description="Page number, ignored when a cursor is given"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    status: OrderStatus | None = Query(None, description="Only orders with this status"),
+    total: Literal["exact", "estimated", "none"] = Query("exact", description="How to count the orders"),
+):
+    count = None
+    if total == "exact":
+        count = (await session.exec(orders_count_statement(status))).one()
+    elif total == "estimated":
+        count = estimated_rows((await session.exec(orders_estimated_count_statement(status))).scalar_one())
+
+    if cursor is None and page > 1:
+        offset = (page - 1) * page_size
+        paginated_statement = orders_queue_statement(status).offset(offset).limit(page_size + 1)
+        orders = list((await session.exec(paginated_statement)).all())
+        return to_orders_page(orders, page_size, count, page)
+
+    # Keyset pages seek straight to the cursor instead of skipping rows
+    orders = []
+    for statement in keyset_queue_statements(cursor, status):
+        orders += (await session.exec(statement.limit(page_size + 1 - len(orders)))).all()
+        if len(orders) > page_size:
+            break
+    return to_orders_page(orders, page_size, count, None if cursor else page)
@@ -1,23 +1,49 @@
-from typing import Annotated, OrderedDict
+from typing import Annotated, Literal, OrderedDict
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import Case
-from sqlalchemy.orm import selectinload
-from sqlmodel import Session, select, func
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
 
 from auth.services.auth_service import get_current_active_user
-from database import get_session
+from database import estimated_rows, get_session
 from service_flow.order.models.order import Order, OrderStatus
 from service_flow.order.schemas.order import OrderRead, OrderUpdate
-from service_flow.order.services.order_service import delete_order_hard, get_order_by_id
+from service_flow.order.services.order_events import last_event_id, order_event_stream
+from service_flow.order.services.order_service import (
+    delete_order_hard,
+    get_order_by_id,
+    keyset_queue_statements,
+    orders_count_statement,
+    orders_estimated_count_statement,
+    orders_queue_statement,
+    pending_queue_statement,
+    to_orders_page,
+    toggle_order_status,
+)
 from service_flow.orderitem.schemas.order_item import OrderItemCreate
-from service_flow.orderitem.services.orderitem_services import create_order_item
+from service_flow.orderitem.services.orderitem_services import create_order_item, create_order_items_bulk
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 router = APIRouter(prefix="/order", tags=["order"])
 
+@router.get(
+    "/stream",
+    dependencies=[Depends(get_current_active_user)]
+)
+def stream_orders(session: SessionDep):
+    """Kitchen feed: the pending queue, then order and item events as server-sent events"""
+    since = last_event_id()
+    orders = session.exec(pending_queue_statement()).all()
+    snapshot = [OrderRead.model_validate(order) for order in orders]
+    # The session is closed before streaming starts; the feed holds no connection
+    return StreamingResponse(
+        order_event_stream(snapshot, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.post(
     "/{order_id}/items",
     status_code=201,
@@ -44,10 +70,7 @@ def create_order_items_bulk_route(
     order_items_in: list[OrderItemCreate],
     session: SessionDep,
 ):
-    return [
-        create_order_item(session, item, order_id)
-        for item in order_items_in
-    ]
+    return create_order_items_bulk(session, order_items_in, order_id)
     
 @router.delete(
     "/{id}",
@@ -79,12 +102,7 @@ def patch_order(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    order.toggle_served()
-    session.add(order)
-    session.commit()
-    session.refresh(order)
-
-    return order
+    return toggle_order_status(session, order)
 
 @router.get(
     "",
@@ -93,44 +111,28 @@ def patch_order(
 )
 def read_orders(
     session: SessionDep,
-    page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(10, ge=1, le=100, description="Items per page")
+    page: int = Query(1, ge=1, description="Page number, ignored when a cursor is given"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    status: OrderStatus | None = Query(None, description="Only orders with this status"),
+    total: Literal["exact", "estimated", "none"] = Query("exact", description="How to count the orders"),
 ):
-    # Base query
-    statement = (
-        select(Order)
-        .options(selectinload(Order.items))
-        .order_by(
-            Case(
-                (Order.status == OrderStatus.PENDING, 0),
-                else_=1
-            ),
-            Case(
-                (Order.status == OrderStatus.PENDING, Order.created_at),
-                else_=None
-            ).asc(),
-            Case(
-                (Order.status == OrderStatus.SERVED, Order.served_at),
-                else_=None
-            ).desc()
-        )
-    )
-    
-    # Get total count
-    count_statement = select(func.count()).select_from(Order)
-    total = session.exec(count_statement).one()
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    paginated_statement = statement.offset(offset).limit(page_size)
-    orders = session.exec(paginated_statement).all()
-    
-    orders_read = [OrderRead.model_validate(order) for order in orders]
-    
-    return {
-        "orders": orders_read,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "total_pages": (total + page_size - 1) // page_size
-    }
\ No newline at end of file
+    count = None
+    if total == "exact":
+        count = session.exec(orders_count_statement(status)).one()
+    elif total == "estimated":
+        count = estimated_rows(session.exec(orders_estimated_count_statement(status)).scalar_one())
+
+    if cursor is None and page > 1:
+        offset = (page - 1) * page_size
+        paginated_statement = orders_queue_statement(status).offset(offset).limit(page_size + 1)
+        orders = list(session.exec(paginated_statement).all())
+        return to_orders_page(orders, page_size, count, page)
+
+    # Keyset pages seek straight to the cursor instead of skipping rows
+    orders = []
+    for statement in keyset_queue_statements(cursor, status):
+        orders += session.exec(statement.limit(page_size + 1 - len(orders))).all()
+        if len(orders) > page_size:
+            break
+    return to_orders_page(orders, page_size, count, None if cursor else page)
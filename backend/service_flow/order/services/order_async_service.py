@@ -0,0 +1,50 @@
+from fastapi import HTTPException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import commit_or_flush_async
+from service_flow.order.models.order import Order, OrderStatus
+from service_flow.order.services.order_events import publish_order_event
+from service_flow.order.services.order_service import add_to_session_total_statement
+from service_flow.tablesession.models.table_session import TableSession
+from statistics.services.analytics_cache import invalidate_after_unserve
+
+async def get_order_by_id(session: AsyncSession, id: int):
+    result = await session.exec(
+        select(Order).where(Order.id == id)
+    )
+    return result.first()
+
+async def create_order(table_session_id: int, session: AsyncSession) -> Order:
+    tablesession = await session.get(TableSession, table_session_id)
+    if not tablesession:
+            raise HTTPException(status_code=404, detail="table session not found")
+    
+    order = Order(
+        session_id=table_session_id
+    )
+
+    session.add(order)
+    publish_order_event(session, "order_created", order)
+    await commit_or_flush_async(session)
+    return order
+    
+async def toggle_order_status(session: AsyncSession, order: Order) -> Order:
+    before = order.total_amount
+    order.toggle_served()
+    session.add(order)
+    if order.total_amount != before:
+        await session.exec(add_to_session_total_statement(order.session_id, order.total_amount - before))
+    if order.status == OrderStatus.PENDING:
+        invalidate_after_unserve(session)
+    publish_order_event(session, "order_status_changed", order)
+    await commit_or_flush_async(session)
+    return order
+
+async def delete_order_hard(session: AsyncSession, order: Order):
+    await session.exec(add_to_session_total_statement(order.session_id, -order.total_amount))
+    await session.delete(order)
+    if order.status == OrderStatus.SERVED:
+        invalidate_after_unserve(session)
+    publish_order_event(session, "order_deleted", order)
+    await commit_or_flush_async(session)
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import run_after_commit
+from service_flow.order.models.order import Order
+from service_flow.orderitem.models.order_item import OrderItem
+from service_flow.orderitem.schemas.order_item import OrderItemRead
+
+
+# Recent events kept for subscribers that connect between loading their
+# snapshot and starting the stream; also the per-subscriber backlog limit
+ORDER_EVENTS_BUFFER = int(os.getenv("ORDER_EVENTS_BUFFER", "1000"))
+ORDER_EVENTS_KEEPALIVE = float(os.getenv("ORDER_EVENTS_KEEPALIVE", "15"))
+
+# Events only reach subscribers of the same process; run a single worker for
+# the kitchen feed or put a broker in front of it.
+_lock = threading.Lock()
+_sequence = 0
+_recent: deque[tuple[int, str, dict]] = deque(maxlen=ORDER_EVENTS_BUFFER)
+_subscribers: dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+
+
+def last_event_id() -> int:
+    with _lock:
+        return _sequence
+
+
+def _offer(queue: asyncio.Queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # A client that stopped reading gets a resync instead of a growing backlog
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+
+def _publish(kind: str, data: dict):
+    global _sequence
+    with _lock:
+        _sequence += 1
+        event = (_sequence, kind, jsonable_encoder(data))
+        _recent.append(event)
+        # Under the lock so every subscriber sees events in sequence order
+        for queue, loop in list(_subscribers.items()):
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                _subscribers.pop(queue, None)
+
+
+def order_state(order: Order) -> dict:
+    return {
+        "id": order.id,
+        "session_id": order.session_id,
+        "status": order.status,
+        "created_at": order.created_at,
+        "served_at": order.served_at,
+        "final_total": order.final_total,
+    }
+
+
+# The state is read when the callback runs, after the commit, so events carry
+# what was committed. Writes that roll back publish nothing.
+def publish_order_event(session: Session | AsyncSession, kind: str, order: Order):
+    run_after_commit(session, lambda: _publish(kind, order_state(order)))
+
+
+def publish_items_added(session: Session | AsyncSession, order_id: int, lines: list[OrderItem]):
+    run_after_commit(session, lambda: _publish("items_added", {
+        "order_id": order_id,
+        "items": [OrderItemRead.model_validate(line) for line in lines],
+    }))
+
+
+def publish_item_removed(session: Session | AsyncSession, line: OrderItem):
+    order_id, id = line.order_id, line.id
+    run_after_commit(session, lambda: _publish("item_removed", {"order_id": order_id, "id": id}))
+
+
+def _format(id: int, kind: str, data) -> str:
+    return f"id: {id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+async def order_event_stream(snapshot, since: int):
+    """
+    Server-sent events: the snapshot, then every event published after
+    ``since`` (the last_event_id() taken before the snapshot was loaded).
+    A ``resync`` event means deltas were lost; reconnect for a new snapshot.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=ORDER_EVENTS_BUFFER)
+    with _lock:
+        _subscribers[queue] = asyncio.get_running_loop()
+        backlog = [event for event in _recent if event[0] > since]
+        missed = (backlog[0][0] if backlog else _sequence + 1) > since + 1
+
+    try:
+        yield _format(since, "snapshot", jsonable_encoder(snapshot))
+        if missed:
+            yield _format(since, "resync", {})
+            return
+        for event in backlog:
+            yield _format(*event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), ORDER_EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                yield _format(last_event_id(), "resync", {})
+                return
+            yield _format(*event)
+    finally:
+        with _lock:
+            _subscribers.pop(queue, None)
@@ -1,16 +1,158 @@
+import base64
+import json
+from datetime import datetime
+
 from fastapi import HTTPException
+from sqlalchemy import Case, tuple_, update
+from sqlalchemy.orm import selectinload
 from sqlalchemy.util import OrderedDict
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select, func
 
-from service_flow.order.models.order import Order
-from service_flow.order.schemas.order import OrderUpdate
+from database import commit_or_flush, estimated_count_statement
+from service_flow.order.models.order import Order, OrderStatus
+from service_flow.order.schemas.order import OrderRead, OrderUpdate
+from service_flow.order.services.order_events import publish_order_event
 from service_flow.tablesession.models.table_session import TableSession
+from statistics.services.analytics_cache import invalidate_after_unserve
 
 def get_order_by_id(session: Session, id: int):
     return session.exec(
         select(Order).where(Order.id == id)
     ).first()
 
+def orders_queue_statement(status: OrderStatus | None = None):
+    """Pending orders oldest first, then served orders most recent first"""
+    statement = (
+        select(Order)
+        .options(selectinload(Order.items))
+        .order_by(
+            Case(
+                (Order.status == OrderStatus.PENDING, 0),
+                else_=1
+            ),
+            Case(
+                (Order.status == OrderStatus.PENDING, Order.created_at),
+                else_=None
+            ).asc(),
+            Case(
+                (Order.status == OrderStatus.SERVED, Order.served_at),
+                else_=None
+            ).desc()
+        )
+    )
+    if status is not None:
+        statement = statement.where(Order.status == status)
+    return statement
+
+def orders_count_statement(status: OrderStatus | None = None):
+    statement = select(func.count()).select_from(Order)
+    if status is not None:
+        statement = statement.where(Order.status == status)
+    return statement
+
+def orders_estimated_count_statement(status: OrderStatus | None = None):
+    statement = select(Order.id)
+    if status is not None:
+        statement = statement.where(Order.status == status)
+    return estimated_count_statement(statement)
+
+def encode_cursor(order: Order) -> str:
+    position = order.created_at if order.status == OrderStatus.PENDING else order.served_at
+    raw = json.dumps([order.status.value, position.isoformat() if position else None, order.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[OrderStatus, datetime, int]:
+    try:
+        status, position, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return OrderStatus(status), datetime.fromisoformat(position), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def pending_queue_statement(after: tuple[datetime, int] | None = None):
+    statement = (
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.status == OrderStatus.PENDING)
+        .order_by(col(Order.created_at).asc(), col(Order.id).asc())
+    )
+    if after is not None:
+        statement = statement.where(tuple_(Order.created_at, Order.id) > tuple_(*after))
+    return statement
+
+def served_queue_statement(after: tuple[datetime, int] | None = None):
+    statement = (
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.status == OrderStatus.SERVED)
+        .order_by(col(Order.served_at).desc(), col(Order.id).desc())
+    )
+    if after is not None:
+        statement = statement.where(tuple_(Order.served_at, Order.id) < tuple_(*after))
+    return statement
+
+def keyset_queue_statements(cursor: str | None, status: OrderStatus | None = None):
+    """
+    Statements that continue the queue after the cursor, in order. Run each
+    with the rows still missing as its limit until the page is full; every
+    one of them walks a partial index.
+    """
+    if cursor:
+        bucket, position, id = decode_cursor(cursor)
+        after = (position, id)
+    else:
+        bucket, after = OrderStatus.PENDING, None
+
+    statements = []
+    if bucket == OrderStatus.PENDING:
+        if status in (None, OrderStatus.PENDING):
+            statements.append(pending_queue_statement(after))
+        after = None
+    if status in (None, OrderStatus.SERVED):
+        statements.append(served_queue_statement(after))
+    return statements
+
+def to_orders_page(
+    orders: list[Order],
+    page_size: int,
+    total: int | None,
+    page: int | None,
+) -> dict:
+    """Response for GET /order; ``orders`` may hold one extra row to detect a next page"""
+    has_more = len(orders) > page_size
+    orders = orders[:page_size]
+    return {
+        "orders": [OrderRead.model_validate(order) for order in orders],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+        "next_cursor": encode_cursor(orders[-1]) if has_more else None,
+    }
+
+def add_to_totals_statement(order_id: int, amount: float):
+    """Add to an order's subtotal and, while it is unserved, to its session's"""
+    order = (
+        update(Order)
+        .where(col(Order.id) == order_id)
+        .values(subtotal=Order.subtotal + amount)
+        .returning(col(Order.session_id), col(Order.final_total))
+        .cte("updated_order")
+    )
+    return (
+        update(TableSession)
+        .where(col(TableSession.id) == order.c.session_id, order.c.final_total.is_(None))
+        .values(subtotal=TableSession.subtotal + amount)
+        .execution_options(synchronize_session=False)
+    )
+
+def add_to_session_total_statement(session_id: int, amount: float):
+    return (
+        update(TableSession)
+        .where(col(TableSession.id) == session_id)
+        .values(subtotal=TableSession.subtotal + amount)
+        .execution_options(synchronize_session=False)
+    )
+
 def create_order(table_session_id: int, session: Session) -> Order:
     tablesession = session.get(TableSession, table_session_id)
     if not tablesession:
@@ -22,13 +164,30 @@ def create_order(table_session_id: int, session: Session) -> Order:
     )
 
     session.add(order)
-    session.commit()
-    session.refresh(order)
+    publish_order_event(session, "order_created", order)
+    commit_or_flush(session)
     return order
     
+def toggle_order_status(session: Session, order: Order) -> Order:
+    before = order.total_amount
+    order.toggle_served()
+    session.add(order)
+    # Reopening an order puts items added since it was served on the bill
+    if order.total_amount != before:
+        session.exec(add_to_session_total_statement(order.session_id, order.total_amount - before))
+    if order.status == OrderStatus.PENDING:
+        invalidate_after_unserve(session)
+    publish_order_event(session, "order_status_changed", order)
+    commit_or_flush(session)
+    return order
+
 def delete_order_hard(session: Session, order: Order):
+    session.exec(add_to_session_total_statement(order.session_id, -order.total_amount))
     session.delete(order)
-    session.commit()
+    if order.status == OrderStatus.SERVED:
+        invalidate_after_unserve(session)
+    publish_order_event(session, "order_deleted", order)
+    commit_or_flush(session)
     
 def update_order(
     *,
@@ -42,6 +201,5 @@ def update_order(
         setattr(order, key, value)
 
     session.add(order)
-    session.commit()
-    session.refresh(order)
+    commit_or_flush(session)
     return order
\ No newline at end of file
@@ -1,3 +1,4 @@
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 from typing import TYPE_CHECKING
 
@@ -6,13 +7,25 @@ if TYPE_CHECKING:
     from menu.models.menu_item import MenuItem
 
 class OrderItem(SQLModel, table=True):
+    __table_args__ = (
+        # One line per dish and note in an order; a missing note counts as ''
+        Index(
+            "uq_orderitem_order_menu_item_note",
+            "order_id",
+            "menu_item_id",
+            text("coalesce(note, '')"),
+            unique=True,
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     
     order_id: int = Field(
         foreign_key="order.id",  # Delete items when order is deleted
     )
     menu_item_id: int = Field(
-        foreign_key="menuitem.id"
+        foreign_key="menuitem.id",
+        index=True,
     )
     
     quantity: int = Field(default=1, gt=0)  # Must be > 0
@@ -0,0 +1,29 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from auth.services.auth_service import get_current_active_user
+from database import get_async_session
+from service_flow.orderitem.services.orderitem_async_services import delete_order_item_hard, get_order_item_by_id
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session, scope="function")]
+
+router = APIRouter(prefix="/orderitem", tags=["order-items"])
+    
+@router.delete(
+    "/{id}",
+    status_code=204,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def delete_order_item(
+    id: int,
+    session: AsyncSessionDep,
+):
+    orderitem = await get_order_item_by_id(session, id)
+
+    if not orderitem:
+        raise HTTPException(status_code=404, detail="order item not found")
+
+    await delete_order_item_hard(session, orderitem)
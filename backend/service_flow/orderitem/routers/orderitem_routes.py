@@ -8,7 +8,7 @@ from database import get_session
 from service_flow.orderitem.services.orderitem_services import delete_order_item_hard, get_order_item_by_id
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 router = APIRouter(prefix="/orderitem", tags=["order-items"])
     
@@ -1,9 +1,18 @@
+from pydantic import field_validator
 from sqlmodel import SQLModel, Field
 
 class OrderItemCreate(SQLModel):
     menu_item_id: int
     quantity: int = Field(default=1, gt=0)
     note: str | None = None
+
+    @field_validator("note")
+    @classmethod
+    def blank_note_is_none(cls, note: str | None) -> str | None:
+        # Lines are merged per note, so " " and "" must not start a new line
+        if note is None:
+            return None
+        return note.strip() or None
     
 class OrderItemRead(SQLModel):
     id: int
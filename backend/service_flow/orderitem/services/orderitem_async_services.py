@@ -0,0 +1,72 @@
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi import HTTPException
+
+from database import commit_or_flush_async
+from menu.models.menu_item import MenuItem
+from service_flow.order.models.order import Order
+from service_flow.order.services.order_events import publish_item_removed, publish_items_added
+from service_flow.order.services.order_service import add_to_totals_statement
+from service_flow.orderitem.models.order_item import OrderItem
+from service_flow.orderitem.schemas.order_item import OrderItemCreate
+from service_flow.orderitem.services.orderitem_services import (
+    added_amount,
+    check_menu_items,
+    menu_prices_statement,
+    merge_requested_items,
+    upsert_lines_statement,
+)
+
+
+async def get_order_item_by_id(session: AsyncSession, id: int):
+    result = await session.exec(
+        select(OrderItem).where(OrderItem.id == id)
+    )
+    return result.first()
+
+async def create_order_item(session: AsyncSession, data: OrderItemCreate, order_id: int) -> OrderItem:
+    order = await session.get(Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="order not found")
+        
+    menu_item = await session.get(MenuItem, data.menu_item_id)
+    if not menu_item:
+        raise HTTPException(status_code=404, detail="menu item not found")
+
+    result = await session.exec(
+        upsert_lines_statement(
+            order_id,
+            {(data.menu_item_id, data.note): data.quantity},
+            {menu_item.id: menu_item.price},  # type: ignore
+        )
+    )
+    order_item = result.scalar_one()
+    await session.exec(add_to_totals_statement(order_id, data.quantity * order_item.price_at_time))
+    publish_items_added(session, order_id, [order_item])
+    await commit_or_flush_async(session)
+    return order_item
+    
+async def delete_order_item_hard(session: AsyncSession, orderitem: OrderItem):
+    await session.exec(add_to_totals_statement(orderitem.order_id, -orderitem.line_total))
+    await session.delete(orderitem)
+    publish_item_removed(session, orderitem)
+    await commit_or_flush_async(session)
+
+async def create_order_items_bulk(session: AsyncSession, items: list[OrderItemCreate], order_id: int) -> list[OrderItem]:
+    order = await session.get(Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="order not found")
+
+    requested = merge_requested_items(items)
+    if not requested:
+        return []
+
+    prices = dict((await session.exec(menu_prices_statement({key[0] for key in requested}))).all())
+    check_menu_items(requested, prices)
+
+    result = await session.exec(upsert_lines_statement(order_id, requested, prices))
+    lines = {(line.menu_item_id, line.note): line for line in result.scalars()}
+    await session.exec(add_to_totals_statement(order_id, added_amount(requested, lines)))
+    publish_items_added(session, order_id, list(lines.values()))
+    await commit_or_flush_async(session)
+    return [lines[key] for key in requested]
@@ -1,8 +1,13 @@
-from sqlmodel import Session, select
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
 from fastapi import HTTPException
 
+from database import commit_or_flush
 from menu.models.menu_item import MenuItem
 from service_flow.order.models.order import Order
+from service_flow.order.services.order_events import publish_item_removed, publish_items_added
+from service_flow.order.services.order_service import add_to_totals_statement
 from service_flow.orderitem.models.order_item import OrderItem
 from service_flow.orderitem.schemas.order_item import OrderItemCreate
 
@@ -12,6 +17,31 @@ def get_order_item_by_id(session: Session, id: int):
         select(OrderItem).where(OrderItem.id == id)
     ).first()
 
+def upsert_lines_statement(order_id: int, requested: dict[tuple[int, str | None], int], prices: dict[int, float]):
+    """Insert the lines, or add to the quantity of lines the order already has"""
+    statement = insert(OrderItem).values([
+        {
+            "order_id": order_id,
+            "menu_item_id": menu_item_id,
+            "note": note,
+            "quantity": quantity,
+            "price_at_time": prices[menu_item_id],
+        }
+        for (menu_item_id, note), quantity in requested.items()
+    ])
+    return (
+        statement.on_conflict_do_update(
+            index_elements=[
+                OrderItem.order_id,
+                OrderItem.menu_item_id,
+                func.coalesce(OrderItem.note, literal_column("''")),
+            ],
+            set_={"quantity": OrderItem.quantity + statement.excluded.quantity},
+        )
+        .returning(OrderItem)
+        .execution_options(populate_existing=True)
+    )
+
 def create_order_item(session: Session, data: OrderItemCreate, order_id: int) -> OrderItem:
     order = session.get(Order, order_id)
     if not order:
@@ -20,34 +50,64 @@ def create_order_item(session: Session, data: OrderItemCreate, order_id: int) ->
     menu_item = session.get(MenuItem, data.menu_item_id)
     if not menu_item:
         raise HTTPException(status_code=404, detail="menu item not found")
-    
-    # Check if this menu item already exists in the order
-    existing_item = session.exec(
-        select(OrderItem).where(
-            OrderItem.order_id == order_id,
-            OrderItem.menu_item_id == data.menu_item_id,
-            OrderItem.note == data.note
-        )
-    ).first()
 
-    if existing_item:
-        existing_item.quantity += data.quantity
-        session.add(existing_item)
-        session.commit()
-        session.refresh(existing_item)
-        return existing_item
-
-    # No existing item — create a new row
-    order_item = OrderItem(
-        **data.model_dump(exclude={"price_at_time"}),
-        order_id=order_id,
-        price_at_time=menu_item.price
-    )
-    session.add(order_item)
-    session.commit()
-    session.refresh(order_item)
+    # Adding a dish the order already has bumps that line's quantity
+    order_item = session.exec(
+        upsert_lines_statement(
+            order_id,
+            {(data.menu_item_id, data.note): data.quantity},
+            {menu_item.id: menu_item.price},  # type: ignore
+        )
+    ).scalar_one()
+    # A merged line keeps its original price
+    session.exec(add_to_totals_statement(order_id, data.quantity * order_item.price_at_time))
+    publish_items_added(session, order_id, [order_item])
+    commit_or_flush(session)
     return order_item
     
 def delete_order_item_hard(session: Session, orderitem: OrderItem):
+    session.exec(add_to_totals_statement(orderitem.order_id, -orderitem.line_total))
     session.delete(orderitem)
-    session.commit()
\ No newline at end of file
+    publish_item_removed(session, orderitem)
+    commit_or_flush(session)
+
+def merge_requested_items(items: list[OrderItemCreate]) -> dict[tuple[int, str | None], int]:
+    """Total quantity per (menu_item_id, note), in the order first requested"""
+    requested: dict[tuple[int, str | None], int] = {}
+    for item in items:
+        key = (item.menu_item_id, item.note)
+        requested[key] = requested.get(key, 0) + item.quantity
+    return requested
+
+def menu_prices_statement(menu_item_ids: set[int]):
+    return select(MenuItem.id, MenuItem.price).where(col(MenuItem.id).in_(menu_item_ids))
+
+def added_amount(requested: dict[tuple[int, str | None], int], lines: dict[tuple[int, str | None], OrderItem]) -> float:
+    """What the requested quantities add to the order, at each line's stored price"""
+    return sum(quantity * lines[key].price_at_time for key, quantity in requested.items())
+
+def check_menu_items(requested: dict[tuple[int, str | None], int], prices: dict[int, float]):
+    if any(menu_item_id not in prices for menu_item_id, _ in requested):
+        raise HTTPException(status_code=404, detail="menu item not found")
+
+def create_order_items_bulk(session: Session, items: list[OrderItemCreate], order_id: int) -> list[OrderItem]:
+    """Add many items at once; returns one line per distinct (menu item, note)"""
+    order = session.get(Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="order not found")
+
+    requested = merge_requested_items(items)
+    if not requested:
+        return []
+
+    prices = dict(session.exec(menu_prices_statement({key[0] for key in requested})).all())
+    check_menu_items(requested, prices)
+
+    lines = {
+        (line.menu_item_id, line.note): line
+        for line in session.exec(upsert_lines_statement(order_id, requested, prices)).scalars()
+    }
+    session.exec(add_to_totals_statement(order_id, added_amount(requested, lines)))
+    publish_items_added(session, order_id, list(lines.values()))
+    commit_or_flush(session)
+    return [lines[key] for key in requested]
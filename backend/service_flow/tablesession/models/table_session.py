@@ -1,6 +1,6 @@
 from sqlmodel import Field, SQLModel, Relationship
 from datetime import datetime, timezone
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index, text
 from typing import TYPE_CHECKING, Optional, List
 
 if TYPE_CHECKING:
@@ -10,16 +10,38 @@ if TYPE_CHECKING:
 
 
 class TableSession(SQLModel, table=True):
+    __table_args__ = (
+        # At most one open session per table; also serves the floor view
+        Index(
+            "uq_tablesession_open_table",
+            "table_id",
+            unique=True,
+            postgresql_where=text("ended_at IS NULL"),
+        ),
+        # Session history newest first, and revenue by close date, straight
+        # from the index; the filterable columns ride along in INCLUDE
+        Index(
+            "ix_tablesession_history",
+            "ended_at",
+            "id",
+            postgresql_include=["table_id", "customer_id", "final_bill", "started_at"],
+            postgresql_where=text("ended_at IS NOT NULL"),
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
 
+    # Kept on close so history can be filtered by table
     table_id: int | None = Field(
         default=None,
         foreign_key="diningtable.id",
+        ondelete="SET NULL",
     )
 
     customer_id: int | None = Field(
         default=None,
         foreign_key="customer.id",
+        index=True,
     )
 
     started_at: datetime = Field(
@@ -33,6 +55,8 @@ class TableSession(SQLModel, table=True):
     )
 
     final_bill: float | None = None
+    # Running sum of the orders' total_amount, kept up to date by the order services
+    subtotal: float = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     table: Optional["DiningTable"] = Relationship(
         back_populates="sessions"
@@ -51,17 +75,9 @@ class TableSession(SQLModel, table=True):
     def total_bill(self) -> float:
         if self.final_bill is not None:
             return self.final_bill
-        return sum(order.total_amount for order in self.orders)
+        return self.subtotal
 
     @property
     def customer_name(self) -> str | None:
         return self.customer.name if self.customer else None
 
-    def close_session(self):
-        self.ended_at = datetime.now(timezone.utc)
-        self.final_bill = sum(order.total_amount for order in self.orders)
-        self.table_id = None
-
-        if self.customer:
-            self.customer.visit_count += 1
-            self.customer.total_spent += self.final_bill
@@ -0,0 +1,142 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from auth.services.auth_service import get_current_active_user
+from database import get_async_read_session, get_async_session
+
+from service_flow.order.schemas.order import OrderCreate
+from service_flow.order.services.order_async_service import create_order
+from service_flow.tablesession.models.table_session import TableSession
+from service_flow.tablesession.schemas.table_session import (
+    TableSessionCreate,
+    TableSessionHistoryFilter,
+    TableSessionRead,
+    TableSessionUpdate,
+)
+from service_flow.tablesession.services.tablesession_service import (
+    HistoryTotal,
+    closed_sessions_statement,
+    decode_history_cursor,
+    table_session_detail_statement,
+    to_history_page,
+)
+from service_flow.tablesession.services.tablesession_async_service import (
+    close_table_session,
+    count_closed_sessions,
+    create_table_session,
+    delete_table_session_hard,
+    get_table_session_by_id,
+    update_table_session,
+)
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session, scope="function")]
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_session)]
+
+router = APIRouter(prefix="/table-sessions", tags=["table-sessions"])
+
+@router.post(
+    "",
+    response_model=TableSessionRead,
+    status_code=201,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def creating_table_session(table_in: TableSessionCreate, session: AsyncSessionDep):
+    return await create_table_session(
+        session,
+        table_in
+    )
+    
+@router.post(
+    "/{table_session_id}/orders",
+    response_model=OrderCreate,
+    status_code=201,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def creating_order(table_session_id: int, session: AsyncSessionDep):
+    return await create_order(
+        table_session_id,
+        session,
+    )
+
+@router.post(
+    "/{session_id}/close",
+    dependencies=[Depends(get_current_active_user)]
+)
+async def closing_table_session(session_id: int, session: AsyncSessionDep):
+    await close_table_session(session, session_id)
+    
+
+@router.get(
+    "/history/paginated",
+    response_model=dict, 
+    dependencies=[Depends(get_current_active_user)]
+)
+async def get_table_sessions_paginated(
+    session: AsyncReadSessionDep,
+    filters: Annotated[TableSessionHistoryFilter, Depends()],
+    page: int = Query(1, ge=1, description="Page number, ignored when a cursor is given"),
+    page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    total: HistoryTotal = Query("exact", description="How to count the sessions"),
+):
+    count = await count_closed_sessions(session, filters, total)
+
+    if cursor is None and page > 1:
+        offset = (page - 1) * page_size
+        paginated_statement = closed_sessions_statement(filters).offset(offset).limit(page_size + 1)
+        rows = list((await session.exec(paginated_statement)).all())
+        return to_history_page(rows, page_size, count, page)
+
+    # Keyset pages seek straight to the cursor instead of skipping rows
+    after = decode_history_cursor(cursor) if cursor else None
+    rows = list((await session.exec(closed_sessions_statement(filters, after).limit(page_size + 1))).all())
+    return to_history_page(rows, page_size, count, None if cursor else page)
+
+    
+@router.get(
+    "/{session_id}",
+    response_model=TableSessionRead,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def get_table_session(session_id: int, session: AsyncSessionDep):
+    table_session = (await session.exec(table_session_detail_statement(session_id))).first()
+
+    if not table_session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return table_session
+
+    
+@router.delete(
+    "/{table_session_id}",
+    status_code=204,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def delete_table_session(
+    table_session_id: int,
+    session: AsyncSessionDep,
+):
+    table_session = await get_table_session_by_id(session, table_session_id)
+
+    if not table_session:
+        raise HTTPException(status_code=404, detail="table session not found")
+
+    await delete_table_session_hard(session, table_session)
+    
+@router.patch(
+    "/{table_session_id}",
+    response_model=TableSession,
+    dependencies=[Depends(get_current_active_user)]
+)
+async def patch_table_session(
+    table_session_id: int,
+    data: TableSessionUpdate,
+    session: AsyncSessionDep,
+):
+    tablesession = await get_table_session_by_id(session, table_session_id)
+
+    if not tablesession:
+        raise HTTPException(status_code=404, detail="table session not found")
+
+    return await update_table_session(session=session, tablesession=tablesession, data=data)
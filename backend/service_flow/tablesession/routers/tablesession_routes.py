@@ -1,20 +1,35 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import selectinload
-from sqlmodel import Session, col, func, select
+from sqlmodel import Session
 
 from auth.services.auth_service import get_current_active_user
-from database import get_session
+from database import get_read_session, get_session
 
 from service_flow.order.schemas.order import OrderCreate
 from service_flow.order.services.order_service import create_order
 from service_flow.tablesession.models.table_session import TableSession
-from service_flow.tablesession.schemas.table_session import TableSessionCreate, TableSessionPagination, TableSessionRead, TableSessionUpdate
-from service_flow.tablesession.services.tablesession_service import create_table_session, delete_table_session_hard, get_table_session_by_id, update_table_session
-
-from service_flow.order.models.order import Order, OrderStatus
+from service_flow.tablesession.schemas.table_session import (
+    TableSessionCreate,
+    TableSessionHistoryFilter,
+    TableSessionRead,
+    TableSessionUpdate,
+)
+from service_flow.tablesession.services.tablesession_service import (
+    close_table_session,
+    HistoryTotal,
+    closed_sessions_statement,
+    count_closed_sessions,
+    decode_history_cursor,
+    create_table_session,
+    delete_table_session_hard,
+    get_table_session_by_id,
+    table_session_detail_statement,
+    to_history_page,
+    update_table_session,
+)
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
 
 router = APIRouter(prefix="/table-sessions", tags=["table-sessions"])
 
@@ -46,31 +61,8 @@ def creating_order(table_session_id: int, session: SessionDep):
     "/{session_id}/close",
     dependencies=[Depends(get_current_active_user)]
 )
-def close_table_session(session_id: int, session: SessionDep):
-    tablesession = session.get(TableSession, session_id)
-
-    if not tablesession:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    if tablesession.ended_at is not None:
-        raise HTTPException(status_code=400, detail="Session already closed")
-        
-    unserved_orders = [
-        order for order in tablesession.orders
-        if order.status != OrderStatus.SERVED
-    ]
-
-    if unserved_orders:
-        raise HTTPException(
-            status_code=400,
-            detail="Cannot close session: all orders must be served"
-        )
-
-    tablesession.close_session()
-
-    session.add(tablesession)
-    session.commit()
-    session.refresh(tablesession)
+def closing_table_session(session_id: int, session: SessionDep):
+    close_table_session(session, session_id)
     
 
 @router.get(
@@ -79,52 +71,25 @@ def close_table_session(session_id: int, session: SessionDep):
     dependencies=[Depends(get_current_active_user)]
 )
 def get_table_sessions_paginated(
-    session: SessionDep,
-    page: int = Query(1, ge=1, description="Page number starting from 1"),
-    page_size: int = Query(10, ge=1, le=100, description="Number of items per page")
+    session: ReadSessionDep,
+    filters: Annotated[TableSessionHistoryFilter, Depends()],
+    page: int = Query(1, ge=1, description="Page number, ignored when a cursor is given"),
+    page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    total: HistoryTotal = Query("exact", description="How to count the sessions"),
 ):
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
-    # Query for closed sessions only, ordered by ended_at descending
-    statement = (
-        select(TableSession)
-        .options(selectinload(TableSession.customer))  # ← This is essential!
-        .where(col(TableSession.ended_at).is_not(None))
-        .order_by(TableSession.ended_at.desc())
-        .offset(offset)
-        .limit(page_size)
-    )
-    
-    sessions = session.exec(statement).all()
-    
-    # Get total count for pagination metadata
-    count_statement = (
-        select(func.count(TableSession.id)) # type:ignore
-        .where(col(TableSession.ended_at).is_not(None))
-    )
-    total = session.exec(count_statement).one()
-    
-    # Convert to pagination schema
-    items = [
-        TableSessionPagination(
-            id=s.id,
-            table_id=s.table_id,
-            customer_name=s.customer_name,
-            final_bill=s.final_bill,  
-            started_at=s.started_at,  
-            ended_at=s.ended_at
-        )
-        for s in sessions
-    ]
-    
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "total_pages": (total + page_size - 1) // page_size
-    }
+    count = count_closed_sessions(session, filters, total)
+
+    if cursor is None and page > 1:
+        offset = (page - 1) * page_size
+        paginated_statement = closed_sessions_statement(filters).offset(offset).limit(page_size + 1)
+        rows = list(session.exec(paginated_statement).all())
+        return to_history_page(rows, page_size, count, page)
+
+    # Keyset pages seek straight to the cursor instead of skipping rows
+    after = decode_history_cursor(cursor) if cursor else None
+    rows = list(session.exec(closed_sessions_statement(filters, after).limit(page_size + 1)).all())
+    return to_history_page(rows, page_size, count, None if cursor else page)
 
     
 @router.get(
@@ -134,16 +99,7 @@ def get_table_sessions_paginated(
 )
 def get_table_session(session_id: int, session: SessionDep):
 
-    statement = (
-        select(TableSession)
-        .where(TableSession.id == session_id)
-        .options(
-            selectinload(TableSession.orders) #type: ignore
-            .selectinload(Order.items) #type: ignore
-        )
-    )
-
-    table_session = session.exec(statement).first()
+    table_session = session.exec(table_session_detail_statement(session_id)).first()
 
     if not table_session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -1,14 +1,33 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
 from auth.services.auth_service import require_admin
-from database import get_session
+from database import get_read_session, get_session
 
+from service_flow.tablesession.schemas.table_session import TableSessionHistoryFilter
+from service_flow.tablesession.services.tablesession_export import EXPORT_MEDIA_TYPES, ExportFormat, export_lines
 from service_flow.tablesession.services.tablesession_service import  delete_table_session_hard, get_table_session_by_id
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
 
 router = APIRouter(prefix="/admin/table-session", tags=["table-session"])
 
+@router.get(
+    "/export",
+    dependencies=[Depends(require_admin)]
+)
+def export_table_sessions(
+    session: ReadSessionDep,
+    filters: Annotated[TableSessionHistoryFilter, Depends()],
+    format: ExportFormat = Query("csv", description="csv or ndjson"),
+):
+    # The read session stays open until the last chunk is sent
+    return StreamingResponse(
+        export_lines(session, filters, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="table-sessions.{format}"'},
+    )
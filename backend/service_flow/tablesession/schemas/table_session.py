@@ -18,6 +18,14 @@ class TableSessionRead(SQLModel):
     ended_at: datetime | None = None
     orders: list[OrderRead] = []
     
+class TableSessionHistoryFilter(SQLModel):
+    ended_from: datetime | None = None
+    ended_to: datetime | None = None
+    table_id: int | None = None
+    customer_id: int | None = None
+    min_bill: float | None = None
+    max_bill: float | None = None
+    
 class TableSessionPagination(SQLModel):
     id: int
     table_id: int | None
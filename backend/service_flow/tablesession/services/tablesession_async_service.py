@@ -0,0 +1,109 @@
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import commit_or_flush_async, estimated_rows
+from service_flow.diningtable.models.dining_table import DiningTable
+from service_flow.tablesession.models.table_session import TableSession
+from service_flow.tablesession.schemas.table_session import (
+    TableSessionCreate,
+    TableSessionHistoryFilter,
+    TableSessionUpdate,
+)
+from service_flow.tablesession.services.tablesession_service import (
+    HistoryTotal,
+    cache_history_count,
+    close_session_statement,
+    closed_sessions_count_statement,
+    closed_sessions_estimated_count_statement,
+    ensure_session_can_close,
+    get_cached_history_count,
+    locked_session_orders_statement,
+    locked_table_session_statement,
+    raise_if_table_occupied,
+    unserved_orders_exist_statement,
+)
+from statistics.services.analytics_cache import invalidate_after_close, invalidate_after_history_change
+from statistics.services.stat_services import session_rollup_statements
+
+async def get_table_session_by_id(session: AsyncSession, id: int):
+    result = await session.exec(
+        select(TableSession).where(TableSession.id == id)
+    )
+    return result.first()
+
+async def create_table_session(session: AsyncSession, data: TableSessionCreate) -> TableSession:
+    diningtable = await session.get(DiningTable, data.table_id)
+    if not diningtable:
+            raise HTTPException(status_code=404, detail="Dining table not found")
+
+    # orders=[] so the response can list the orders without a lazy load
+    tablesession = TableSession(
+        table_id=data.table_id,
+        orders=[],
+    )
+
+    try:
+        async with session.begin_nested():
+            session.add(tablesession)
+    except IntegrityError as error:
+        raise_if_table_occupied(error)
+        raise
+
+    await commit_or_flush_async(session)
+    return tablesession
+
+async def count_closed_sessions(
+    session: AsyncSession,
+    filters: TableSessionHistoryFilter,
+    total: HistoryTotal,
+) -> int | None:
+    if total == "none":
+        return None
+    if total == "estimated":
+        plan = (await session.exec(closed_sessions_estimated_count_statement(filters))).scalar_one()
+        return estimated_rows(plan)
+    if total == "cached":
+        count = get_cached_history_count(filters)
+        if count is not None:
+            return count
+
+    count = (await session.exec(closed_sessions_count_statement(filters))).one()
+    cache_history_count(filters, count)
+    return count
+
+async def close_table_session(session: AsyncSession, session_id: int):
+    (await session.exec(locked_session_orders_statement(session_id))).all()
+    tablesession = (await session.exec(locked_table_session_statement(session_id))).first()
+    has_unserved_orders = (await session.exec(unserved_orders_exist_statement(session_id))).one()
+    ensure_session_can_close(tablesession, has_unserved_orders)
+
+    await session.exec(close_session_statement(session_id))
+    for statement in session_rollup_statements(session_id):
+        await session.exec(statement)
+    invalidate_after_close(session)
+    await commit_or_flush_async(session)
+    
+async def delete_table_session_hard(session: AsyncSession, table: TableSession):
+    if table.ended_at is not None:
+        for statement in session_rollup_statements(table.id, sign=-1):
+            await session.exec(statement)
+        invalidate_after_history_change(session)
+    await session.delete(table)
+    await commit_or_flush_async(session)
+    
+async def update_table_session(
+    *,
+    session: AsyncSession,
+    tablesession: TableSession,
+    data: TableSessionUpdate
+) -> TableSession:
+    data_dict = data.model_dump(exclude_unset=True)
+
+    for key, value in data_dict.items():
+        setattr(tablesession, key, value)
+
+    session.add(tablesession)
+    await commit_or_flush_async(session)
+    return tablesession
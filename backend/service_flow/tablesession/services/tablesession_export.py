@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from enum import Enum
+from typing import Literal
+
+from sqlmodel import Session, col, select
+
+from customer.models.customer import Customer
+from menu.models.menu_item import MenuItem
+from service_flow.order.models.order import Order
+from service_flow.orderitem.models.order_item import OrderItem
+from service_flow.tablesession.models.table_session import TableSession
+from service_flow.tablesession.schemas.table_session import TableSessionHistoryFilter
+from service_flow.tablesession.services.tablesession_service import closed_session_conditions
+
+
+# Rows fetched per round-trip from the server-side cursor
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+ExportFormat = Literal["csv", "ndjson"]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_lines_statement(filters: TableSessionHistoryFilter):
+    """
+    One row per item line of the closed sessions, in close order. Sessions
+    without orders and orders without items still get a row, with the
+    missing columns empty.
+    """
+    return (
+        select(
+            col(TableSession.id).label("session_id"),
+            TableSession.table_id,
+            TableSession.customer_id,
+            col(Customer.name).label("customer_name"),
+            TableSession.started_at,
+            TableSession.ended_at,
+            TableSession.final_bill,
+            col(Order.id).label("order_id"),
+            col(Order.status).label("order_status"),
+            col(Order.created_at).label("ordered_at"),
+            Order.served_at,
+            col(Order.final_total).label("order_total"),
+            col(OrderItem.id).label("line_id"),
+            OrderItem.menu_item_id,
+            col(MenuItem.name).label("item_name"),
+            OrderItem.quantity,
+            OrderItem.price_at_time,
+            OrderItem.note,
+            (OrderItem.price_at_time * OrderItem.quantity).label("line_total"),
+        )
+        .outerjoin(Customer, col(Customer.id) == TableSession.customer_id)
+        .outerjoin(Order, col(Order.session_id) == TableSession.id)
+        .outerjoin(OrderItem, col(OrderItem.order_id) == Order.id)
+        .outerjoin(MenuItem, col(MenuItem.id) == OrderItem.menu_item_id)
+        .where(*closed_session_conditions(filters))
+        .order_by(
+            col(TableSession.ended_at),
+            col(TableSession.id),
+            col(Order.id),
+            col(OrderItem.id),
+        )
+    )
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def export_lines(session: Session, filters: TableSessionHistoryFilter, format: ExportFormat):
+    """
+    Stream the export a batch at a time. Rows come from a server-side cursor
+    and are plain tuples, not ORM objects, so memory stays flat however long
+    the range is.
+    """
+    statement = export_lines_statement(filters).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    result = session.exec(statement)
+    columns = list(result.keys())
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if format == "csv":
+        writer.writerow(columns)
+
+    for rows in result.partitions():
+        for row in rows:
+            values = [_value(value) for value in row]
+            if format == "csv":
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(columns, values))))
+                buffer.write("\n")
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # A range with no sessions still sends the CSV header
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -1,39 +1,302 @@
+import base64
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Literal
+
 from fastapi import HTTPException
-from sqlmodel import Session, select
+from sqlalchemy import exists, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, col, func, select
 
+from customer.models.customer import Customer
+from database import commit_or_flush, estimated_count_statement, estimated_rows
 from service_flow.diningtable.models.dining_table import DiningTable
+from service_flow.order.models.order import Order, OrderStatus
 from service_flow.tablesession.models.table_session import TableSession
-from service_flow.tablesession.schemas.table_session import TableSessionCreate, TableSessionUpdate
+from service_flow.tablesession.schemas.table_session import (
+    TableSessionCreate,
+    TableSessionHistoryFilter,
+    TableSessionPagination,
+    TableSessionUpdate,
+)
+from statistics.services.analytics_cache import invalidate_after_close, invalidate_after_history_change
+from statistics.services.stat_services import session_rollup_statements
+
+OPEN_SESSION_INDEX = "uq_tablesession_open_table"
+
+# "cached" history totals are exact counts reused per filter for this long
+HISTORY_COUNT_TTL_SECONDS = float(os.getenv("HISTORY_COUNT_TTL_SECONDS", "30"))
+HISTORY_COUNT_CACHE_SIZE = 1000
+
+HistoryTotal = Literal["exact", "cached", "estimated", "none"]
+
+_history_counts_lock = threading.Lock()
+_history_counts: dict[tuple, tuple[float, int]] = {}
 
 def get_table_session_by_id(session: Session, id: int):
     return session.exec(
         select(TableSession).where(TableSession.id == id)
     ).first()
 
-def create_table_session(session: Session, data: TableSessionCreate) -> TableSession:
-    diningtable = session.get(DiningTable, data.table_id)
-    if not diningtable:
-            raise HTTPException(status_code=404, detail="Dining table not found")
-    
-    # 2. Enforce business rule
-    if diningtable.is_occupied:
+def table_session_detail_statement(id: int):
+    return (
+        select(TableSession)
+        .where(TableSession.id == id)
+        .options(
+            selectinload(TableSession.orders) #type: ignore
+            .selectinload(Order.items) #type: ignore
+        )
+    )
+
+def closed_session_conditions(filters: TableSessionHistoryFilter):
+    conditions = [col(TableSession.ended_at).is_not(None)]
+    if filters.ended_from is not None:
+        conditions.append(col(TableSession.ended_at) >= filters.ended_from)
+    if filters.ended_to is not None:
+        conditions.append(col(TableSession.ended_at) < filters.ended_to)
+    if filters.table_id is not None:
+        conditions.append(col(TableSession.table_id) == filters.table_id)
+    if filters.customer_id is not None:
+        conditions.append(col(TableSession.customer_id) == filters.customer_id)
+    if filters.min_bill is not None:
+        conditions.append(col(TableSession.final_bill) >= filters.min_bill)
+    if filters.max_bill is not None:
+        conditions.append(col(TableSession.final_bill) <= filters.max_bill)
+    return conditions
+
+def closed_sessions_statement(
+    filters: TableSessionHistoryFilter,
+    after: tuple[datetime, int] | None = None,
+):
+    """
+    Closed sessions, newest first. Everything but the customer name comes
+    from ix_tablesession_history; ``after`` continues from a cursor.
+    """
+    statement = (
+        select(
+            TableSession.id,
+            TableSession.table_id,
+            TableSession.final_bill,
+            TableSession.started_at,
+            TableSession.ended_at,
+            col(Customer.name).label("customer_name"),
+        )
+        .outerjoin(Customer, col(Customer.id) == TableSession.customer_id)
+        .where(*closed_session_conditions(filters))
+        .order_by(col(TableSession.ended_at).desc(), col(TableSession.id).desc())
+    )
+    if after is not None:
+        statement = statement.where(tuple_(TableSession.ended_at, TableSession.id) < tuple_(*after))
+    return statement
+
+def closed_sessions_count_statement(filters: TableSessionHistoryFilter):
+    return (
+        select(func.count(TableSession.id)) # type:ignore
+        .where(*closed_session_conditions(filters))
+    )
+
+def closed_sessions_estimated_count_statement(filters: TableSessionHistoryFilter):
+    return estimated_count_statement(
+        select(TableSession.id).where(*closed_session_conditions(filters))
+    )
+
+def _history_count_key(filters: TableSessionHistoryFilter) -> tuple:
+    return tuple(filters.model_dump().values())
+
+def get_cached_history_count(filters: TableSessionHistoryFilter) -> int | None:
+    now = time.monotonic()
+    with _history_counts_lock:
+        entry = _history_counts.get(_history_count_key(filters))
+    if entry is None or entry[0] <= now:
+        return None
+    return entry[1]
+
+def cache_history_count(filters: TableSessionHistoryFilter, count: int):
+    if HISTORY_COUNT_TTL_SECONDS <= 0:
+        return
+    now = time.monotonic()
+    with _history_counts_lock:
+        if len(_history_counts) >= HISTORY_COUNT_CACHE_SIZE:
+            for key, (expires, _) in list(_history_counts.items()):
+                if expires <= now:
+                    del _history_counts[key]
+        if len(_history_counts) < HISTORY_COUNT_CACHE_SIZE:
+            _history_counts[_history_count_key(filters)] = (now + HISTORY_COUNT_TTL_SECONDS, count)
+
+def count_closed_sessions(session: Session, filters: TableSessionHistoryFilter, total: HistoryTotal) -> int | None:
+    if total == "none":
+        return None
+    if total == "estimated":
+        return estimated_rows(session.exec(closed_sessions_estimated_count_statement(filters)).scalar_one())
+    if total == "cached":
+        count = get_cached_history_count(filters)
+        if count is not None:
+            return count
+
+    count = session.exec(closed_sessions_count_statement(filters)).one()
+    cache_history_count(filters, count)
+    return count
+
+def encode_history_cursor(row) -> str:
+    raw = json.dumps([row.ended_at.isoformat(), row.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        ended_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(ended_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def to_session_pagination(s) -> TableSessionPagination:
+    return TableSessionPagination(
+        id=s.id,
+        table_id=s.table_id,
+        customer_name=s.customer_name,
+        final_bill=s.final_bill,  
+        started_at=s.started_at,  
+        ended_at=s.ended_at
+    )
+
+def to_history_page(
+    rows: list,
+    page_size: int,
+    total: int | None,
+    page: int | None,
+) -> dict:
+    """Response for the session history; ``rows`` may hold one extra row to detect a next page"""
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return {
+        "items": [to_session_pagination(row) for row in rows],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+        "next_cursor": encode_history_cursor(rows[-1]) if has_more else None,
+    }
+
+def locked_session_orders_statement(session_id: int):
+    # Blocks status toggles and item changes until we commit. Taken before the
+    # session row, the same order the order routes lock in, so they can't deadlock.
+    return (
+        select(col(Order.id))
+        .where(col(Order.session_id) == session_id)
+        .with_for_update()
+    )
+
+def locked_table_session_statement(id: int):
+    # Blocks concurrent closes, and new orders (their foreign key check) until we commit
+    return (
+        select(TableSession)
+        .where(TableSession.id == id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+
+def unserved_orders_exist_statement(session_id: int):
+    return select(
+        exists().where(
+            col(Order.session_id) == session_id,
+            col(Order.status) != OrderStatus.SERVED,
+        )
+    )
+
+def close_session_statement(session_id: int):
+    """
+    End the session, bill the sum of its orders and release the table, then
+    credit the customer with the visit, as a single statement
+    """
+    final_bill = (
+        select(func.coalesce(func.sum(Order.final_total), 0))
+        .where(col(Order.session_id) == session_id)
+        .scalar_subquery()
+    )
+    closed = (
+        update(TableSession)
+        .where(col(TableSession.id) == session_id)
+        .values(
+            ended_at=datetime.now(timezone.utc),
+            final_bill=final_bill,
+        )
+        .returning(col(TableSession.customer_id), col(TableSession.final_bill))
+        .cte("closed_session")
+    )
+    return (
+        update(Customer)
+        .where(col(Customer.id) == closed.c.customer_id)
+        .values(
+            visit_count=Customer.visit_count + 1,
+            total_spent=Customer.total_spent + closed.c.final_bill,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def ensure_session_can_close(tablesession: TableSession | None, has_unserved_orders: bool) -> TableSession:
+    if not tablesession:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if tablesession.ended_at is not None:
+        raise HTTPException(status_code=400, detail="Session already closed")
+
+    if has_unserved_orders:
+        raise HTTPException(
+            status_code=400,
+            detail="Cannot close session: all orders must be served"
+        )
+    return tablesession
+
+def close_table_session(session: Session, session_id: int):
+    session.exec(locked_session_orders_statement(session_id)).all()
+    tablesession = session.exec(locked_table_session_statement(session_id)).first()
+    has_unserved_orders = session.exec(unserved_orders_exist_statement(session_id)).one()
+    ensure_session_can_close(tablesession, has_unserved_orders)
+
+    session.exec(close_session_statement(session_id))
+    for statement in session_rollup_statements(session_id):
+        session.exec(statement)
+    invalidate_after_close(session)
+    commit_or_flush(session)
+
+def raise_if_table_occupied(error: IntegrityError):
+    if OPEN_SESSION_INDEX in str(error.orig):
         raise HTTPException(
             status_code=400,
             detail="Dining table is already occupied"
         )
-    # 3. create user
+
+def create_table_session(session: Session, data: TableSessionCreate) -> TableSession:
+    diningtable = session.get(DiningTable, data.table_id)
+    if not diningtable:
+            raise HTTPException(status_code=404, detail="Dining table not found")
+
     tablesession = TableSession(
         table_id=data.table_id,
     )
 
-    session.add(tablesession)
-    session.commit()
-    session.refresh(tablesession)
+    # One open session per table is enforced by a unique index, so two hosts
+    # seating the same table can't both get in; only the savepoint is undone
+    try:
+        with session.begin_nested():
+            session.add(tablesession)
+    except IntegrityError as error:
+        raise_if_table_occupied(error)
+        raise
+
+    commit_or_flush(session)
     return tablesession
     
 def delete_table_session_hard(session: Session, table: TableSession):
+    if table.ended_at is not None:
+        for statement in session_rollup_statements(table.id, sign=-1):
+            session.exec(statement)
+        invalidate_after_history_change(session)
     session.delete(table)
-    session.commit()
+    commit_or_flush(session)
     
 def update_table_session(
     *,
@@ -47,6 +310,5 @@ def update_table_session(
         setattr(tablesession, key, value)
 
     session.add(tablesession)
-    session.commit()
-    session.refresh(tablesession)
+    commit_or_flush(session)
     return tablesession
\ No newline at end of file
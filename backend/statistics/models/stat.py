@@ -0,0 +1,19 @@
+from datetime import date
+from sqlmodel import Field, SQLModel
+
+
+class DailyRevenue(SQLModel, table=True):
+    """Closed-session totals per close date, maintained by the session services"""
+    day: date = Field(primary_key=True)
+    revenue: float = Field(default=0)
+    sessions: int = Field(default=0)
+    orders: int = Field(default=0)
+    items: int = Field(default=0)
+
+
+class DailyItemSales(SQLModel, table=True):
+    """Quantity and revenue per menu item and close date, maintained like DailyRevenue"""
+    day: date = Field(primary_key=True)
+    menu_item_id: int = Field(primary_key=True, foreign_key="menuitem.id", index=True)
+    quantity: int = Field(default=0)
+    revenue: float = Field(default=0)
@@ -1,13 +1,30 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Annotated
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func
-from sqlmodel import Session, select, col
+from sqlmodel import Session
 from auth.services.auth_service import get_current_active_user
-from database import get_session
-from service_flow.tablesession.models.table_session import TableSession
+from database import get_read_session
+from statistics.services.analytics_cache import cached_analytics
+from statistics.services.stat_services import (
+    RESTAURANT_TIMEZONE,
+    Granularity,
+    ItemSalesGroup,
+    KitchenGroup,
+    TableGroup,
+    TICKET_PERCENTILES,
+    ItemSalesSort,
+    SortDirection,
+    daily_revenue_statement,
+    item_sales_statement,
+    live_occupancy_statement,
+    occupancy_statement,
+    revenue_buckets_statement,
+    revenue_heatmap_statement,
+    table_turnover_statement,
+    ticket_times_statement,
+)
 
-SessionDep = Annotated[Session, Depends(get_session)]
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 @router.get(
@@ -15,7 +32,7 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
     dependencies=[Depends(get_current_active_user)]
 )
 def get_weekly_revenue(
-    session: SessionDep,
+    session: ReadSessionDep,
     start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
     end_date: str = Query(..., description="End date in YYYY-MM-DD format")
 ):
@@ -32,39 +49,303 @@ def get_weekly_revenue(
     except ValueError:
         return {"error": "Invalid date format. Use YYYY-MM-DD"}
     
-    # Query for closed sessions within date range, grouped by day
-    statement = (
-        select(
-            func.date(TableSession.ended_at).label('date'),
-            func.sum(TableSession.final_bill).label('revenue')
-        )
-        .where(
-            col(TableSession.ended_at).is_not(None),  # Only closed sessions
-            TableSession.ended_at >= start,
-            TableSession.ended_at < end
-        )
-        .group_by(func.date(TableSession.ended_at))
-        .order_by(func.date(TableSession.ended_at))
-    )
+    def compute():
+        statement = daily_revenue_statement(start, end)
     
-    results = session.exec(statement).all()
+        results = session.exec(statement).all()
     
-    # Format response
-    daily_revenue = [
-        {
-            "date": str(result.date),
-            "revenue": float(result.revenue) if result.revenue else 0.0
-        }
-        for result in results
-    ]
+        # Format response
+        daily_revenue = [
+            {
+                "date": str(result.date),
+                "revenue": float(result.revenue) if result.revenue else 0.0,
+                "sessions": result.sessions,
+                "orders": result.orders,
+                "items": result.items,
+            }
+            for result in results
+        ]
     
-    # Calculate total for the period
-    total_revenue = sum(item["revenue"] for item in daily_revenue)
+        # Calculate total for the period
+        total_revenue = sum(item["revenue"] for item in daily_revenue)
     
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "daily_revenue": daily_revenue,
+            "total_revenue": total_revenue,
+            "days_count": len(daily_revenue)
+        }
+
+    return cached_analytics("revenue/weekly", (start_date, end_date), end.date(), compute)
+
+
+@router.get(
+    "/revenue",
+    dependencies=[Depends(get_current_active_user)]
+)
+def get_revenue(
+    session: ReadSessionDep,
+    start_date: date = Query(..., description="First day, restaurant-local, YYYY-MM-DD"),
+    end_date: date = Query(..., description="Last day (inclusive), YYYY-MM-DD"),
+    granularity: Granularity = Query("day", description="hour, day, week or month"),
+):
+    """
+    Revenue and closed sessions per bucket. Buckets start at restaurant-local
+    times; weeks start on Monday.
+    """
+    def compute():
+        statement = revenue_buckets_statement(start_date, end_date + timedelta(days=1), granularity)
+        results = session.exec(statement).all()
+
+        buckets = [
+            {
+                "start": result.start.isoformat(),
+                "revenue": float(result.revenue or 0),
+                "sessions": int(result.sessions),
+            }
+            for result in results
+        ]
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "granularity": granularity,
+            "timezone": RESTAURANT_TIMEZONE,
+            "buckets": buckets,
+            "total_revenue": sum(bucket["revenue"] for bucket in buckets),
+        }
+
+    end = end_date + timedelta(days=1)
+    return cached_analytics("revenue", (start_date, end_date, granularity), end, compute)
+
+
+@router.get(
+    "/revenue/heatmap",
+    dependencies=[Depends(get_current_active_user)]
+)
+def get_revenue_heatmap(
+    session: ReadSessionDep,
+    start_date: date = Query(..., description="First day, restaurant-local, YYYY-MM-DD"),
+    end_date: date = Query(..., description="Last day (inclusive), YYYY-MM-DD"),
+):
+    """
+    Revenue and closed sessions by local weekday (1 = Monday .. 7 = Sunday)
+    and hour of day. Cells without sessions are left out.
+    """
+    def compute():
+        statement = revenue_heatmap_statement(start_date, end_date + timedelta(days=1))
+        results = session.exec(statement).all()
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "timezone": RESTAURANT_TIMEZONE,
+            "cells": [
+                {
+                    "day_of_week": int(result.day_of_week),
+                    "hour": int(result.hour),
+                    "revenue": float(result.revenue or 0),
+                    "sessions": int(result.sessions),
+                }
+                for result in results
+            ],
+        }
+
+    end = end_date + timedelta(days=1)
+    return cached_analytics("revenue/heatmap", (start_date, end_date), end, compute)
+
+
+@router.get(
+    "/items",
+    dependencies=[Depends(get_current_active_user)]
+)
+def get_item_sales(
+    session: ReadSessionDep,
+    start_date: date = Query(..., description="First day, restaurant-local, YYYY-MM-DD"),
+    end_date: date = Query(..., description="Last day (inclusive), YYYY-MM-DD"),
+    group: ItemSalesGroup = Query("item", description="item, category or subcategory"),
+    sort_by: ItemSalesSort = Query("quantity", description="Rank by quantity or revenue"),
+    direction: SortDirection = Query("top", description="top for best sellers, bottom for the worst"),
+    limit: int | None = Query(10, ge=1, le=500, description="How many to list"),
+):
+    """
+    Quantity sold and revenue per menu item, category or subcategory in
+    closed sessions, ranked. Items that didn't sell are listed with zeros.
+    """
+    def compute():
+        statement = item_sales_statement(
+            start_date,
+            end_date + timedelta(days=1),
+            group,
+            sort_by,
+            direction,
+            limit,
+        )
+        results = session.exec(statement).all()
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "group": group,
+            "sort_by": sort_by,
+            "direction": direction,
+            "items": [
+                {
+                    "id": result.id,
+                    "name": result.name,
+                    "quantity": int(result.quantity),
+                    "revenue": float(result.revenue),
+                }
+                for result in results
+            ],
+        }
+
+    end = end_date + timedelta(days=1)
+    params = (start_date, end_date, group, sort_by, direction, limit)
+    return cached_analytics("items", params, end, compute)
+
+
+@router.get(
+    "/kitchen",
+    dependencies=[Depends(get_current_active_user)]
+)
+def get_ticket_times(
+    session: ReadSessionDep,
+    start_date: date = Query(..., description="First day, restaurant-local, YYYY-MM-DD"),
+    end_date: date = Query(..., description="Last day (inclusive), YYYY-MM-DD"),
+    group: KitchenGroup = Query("hour", description="hour, table_type or category"),
+):
+    """
+    p50/p90/p99 seconds from placing an order to serving it, for the orders
+    served in the range, per hour placed, table type or menu category.
+    """
+    def compute():
+        statement = ticket_times_statement(start_date, end_date + timedelta(days=1), group)
+        results = session.exec(statement).all()
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "group": group,
+            "timezone": RESTAURANT_TIMEZONE,
+            "buckets": [
+                {
+                    "key": int(result.key) if group == "hour" else result.key,
+                    **({"name": result.name} if group == "category" else {}),
+                    "orders": int(result.orders),
+                    **{
+                        f"{name}_seconds": round(float(getattr(result, name)), 1)
+                        for name in TICKET_PERCENTILES
+                    },
+                }
+                for result in results
+            ],
+        }
+
+    end = end_date + timedelta(days=1)
+    return cached_analytics("kitchen", (start_date, end_date, group), end, compute)
+
+
+@router.get(
+    "/tables/turnover",
+    dependencies=[Depends(get_current_active_user)]
+)
+def get_table_turnover(
+    session: ReadSessionDep,
+    start_date: date = Query(..., description="First day, restaurant-local, YYYY-MM-DD"),
+    end_date: date = Query(..., description="Last day (inclusive), YYYY-MM-DD"),
+    group: TableGroup = Query("table_type", description="table_type or table"),
+):
+    """
+    Closed sessions, average dwell time and turns per table per day, per
+    table type or per table.
+    """
+    def compute():
+        statement = table_turnover_statement(start_date, end_date + timedelta(days=1), group)
+        results = session.exec(statement).all()
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "group": group,
+            "tables": [
+                {
+                    **({"number": result.number} if group == "table" else {}),
+                    "type": result.type,
+                    "tables": result.tables,
+                    "sessions": int(result.sessions),
+                    "average_dwell_minutes": (
+                        round(float(result.average_dwell_seconds) / 60, 1)
+                        if result.average_dwell_seconds is not None else None
+                    ),
+                    "turns_per_table_per_day": round(float(result.turns_per_table_per_day), 2),
+                }
+                for result in results
+            ],
+        }
+
+    end = end_date + timedelta(days=1)
+    return cached_analytics("tables/turnover", (start_date, end_date, group), end, compute)
+
+
+@router.get(
+    "/tables/occupancy",
+    dependencies=[Depends(get_current_active_user)]
+)
+def get_table_occupancy(
+    session: ReadSessionDep,
+    start_date: date = Query(..., description="First day, restaurant-local, YYYY-MM-DD"),
+    end_date: date = Query(..., description="Last day (inclusive), YYYY-MM-DD"),
+):
+    """
+    Percentage of table time occupied per local hour of day and table type,
+    up to now.
+    """
+    def compute():
+        statement = occupancy_statement(start_date, end_date + timedelta(days=1))
+        results = session.exec(statement).all()
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "timezone": RESTAURANT_TIMEZONE,
+            "cells": [
+                {
+                    "hour": int(result.hour),
+                    "type": result.table_type,
+                    "tables": result.tables,
+                    "occupancy_percent": round(float(result.occupancy_percent), 1),
+                }
+                for result in results
+            ],
+        }
+
+    end = end_date + timedelta(days=1)
+    return cached_analytics("tables/occupancy", (start_date, end_date), end, compute)
+
+
+@router.get(
+    "/tables/live",
+    dependencies=[Depends(get_current_active_user)]
+)
+def get_live_occupancy(session: ReadSessionDep):
+    """Occupied tables right now, per table type and overall"""
+    results = session.exec(live_occupancy_statement()).all()
+    tables = sum(result.tables for result in results)
+    occupied = sum(result.occupied for result in results)
+
     return {
-        "start_date": start_date,
-        "end_date": end_date,
-        "daily_revenue": daily_revenue,
-        "total_revenue": total_revenue,
-        "days_count": len(daily_revenue)
-    }
\ No newline at end of file
+        "tables": tables,
+        "occupied": occupied,
+        "occupancy_percent": round(100 * occupied / tables, 1) if tables else 0.0,
+        "types": [
+            {
+                "type": result.type,
+                "tables": result.tables,
+                "occupied": result.occupied,
+                "occupancy_percent": round(100 * result.occupied / result.tables, 1),
+            }
+            for result in results
+        ],
+    }
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from auth.services.auth_service import require_admin
+from statistics.services.analytics_cache import clear_analytics_cache, get_analytics_cache_stats
+
+router = APIRouter(prefix="/admin/analytics", tags=["analytics"])
+
+@router.get(
+    "/cache",
+    dependencies=[Depends(require_admin)]
+)
+def read_analytics_cache_stats():
+    return get_analytics_cache_stats()
+
+@router.delete(
+    "/cache",
+    status_code=204,
+    dependencies=[Depends(require_admin)]
+)
+def clear_analytics_cache_entries():
+    # After scripts.rebuild_daily_revenue, which runs outside the app
+    clear_analytics_cache()
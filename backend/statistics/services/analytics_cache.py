@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as clock, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import run_after_commit
+from statistics.services.stat_services import RESTAURANT_TIMEZONE
+
+# Per-process cache of analytics responses. Ranges that ended more than the
+# grace period ago only change through history edits, which other workers
+# don't hear about, so they keep for the closed TTL; ranges still open (or
+# just closed, with closes still committing or the replica catching up)
+# expire after the TTL or when a session closes.
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "60"))
+ANALYTICS_CACHE_CLOSED_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_CLOSED_TTL_SECONDS", "21600"))
+ANALYTICS_CACHE_GRACE_MINUTES = float(os.getenv("ANALYTICS_CACHE_GRACE_MINUTES", "15"))
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "256"))
+
+_lock = threading.Lock()
+# key -> (expires at, whether the range is closed, response)
+_entries: OrderedDict[tuple, tuple[float, bool, object]] = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+
+def range_closed(end: date) -> bool:
+    """Whether local midnight at the start of ``end`` is more than the grace period ago"""
+    zone = ZoneInfo(RESTAURANT_TIMEZONE)
+    closes_at = datetime.combine(end, clock(), zone) + timedelta(minutes=ANALYTICS_CACHE_GRACE_MINUTES)
+    return datetime.now(zone) >= closes_at
+
+
+def cached_analytics(endpoint: str, params: tuple, end: date, compute):
+    """
+    The response for ``endpoint`` with ``params`` over days before ``end``
+    (exclusive), computed on a miss. The timezone is part of the key.
+    """
+    key = (endpoint, RESTAURANT_TIMEZONE, *params)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] > now:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[2]
+        _stats["misses"] += 1
+
+    # Decided before computing, so the response never predates the grace period
+    closed = range_closed(end)
+    response = compute()
+
+    ttl = ANALYTICS_CACHE_CLOSED_TTL_SECONDS if closed else ANALYTICS_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return response
+    with _lock:
+        _entries[key] = (time.monotonic() + ttl, closed, response)
+        _entries.move_to_end(key)
+        while len(_entries) > ANALYTICS_CACHE_SIZE:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+    return response
+
+
+def invalidate_open_ranges() -> None:
+    """Drop the ranges that are still open; closed ranges are unaffected by new closes"""
+    with _lock:
+        for key in [key for key, (_, closed, _) in _entries.items() if not closed]:
+            del _entries[key]
+            _stats["invalidations"] += 1
+
+
+def clear_analytics_cache() -> None:
+    with _lock:
+        _stats["invalidations"] += len(_entries)
+        _entries.clear()
+
+
+def invalidate_after_close(session: Session | AsyncSession):
+    run_after_commit(session, invalidate_open_ranges)
+
+
+def invalidate_after_history_change(session: Session | AsyncSession):
+    """For changes to past days, like deleting a closed session"""
+    run_after_commit(session, clear_analytics_cache)
+
+
+def invalidate_endpoint(*endpoints: str) -> None:
+    with _lock:
+        for key in [key for key in _entries if key[0] in endpoints]:
+            del _entries[key]
+            _stats["invalidations"] += 1
+
+
+def invalidate_after_menu_change(session: Session | AsyncSession):
+    """Item rankings list the menu by name, so any menu change drops them"""
+    run_after_commit(session, lambda: invalidate_endpoint("items"))
+
+
+def invalidate_after_unserve(session: Session | AsyncSession):
+    """
+    For orders taken back to pending or deleted after being served, which
+    may have been served on an earlier day
+    """
+    run_after_commit(session, lambda: invalidate_endpoint("kitchen"))
+
+
+def invalidate_after_table_change(session: Session | AsyncSession):
+    """Utilisation is measured against the tables there are now"""
+    run_after_commit(session, lambda: invalidate_endpoint("tables/turnover", "tables/occupancy"))
+
+
+def get_analytics_cache_stats() -> dict:
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        open_ranges = sum(1 for _, closed, _ in _entries.values() if not closed)
+        return {
+            **_stats,
+            "size": len(_entries),
+            "closed_ranges": len(_entries) - open_ranges,
+            "open_ranges": open_ranges,
+            "max_size": ANALYTICS_CACHE_SIZE,
+            "ttl_seconds": ANALYTICS_CACHE_TTL_SECONDS,
+            "closed_ttl_seconds": ANALYTICS_CACHE_CLOSED_TTL_SECONDS,
+            "grace_minutes": ANALYTICS_CACHE_GRACE_MINUTES,
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,572 @@
+import os
+from datetime import date, datetime, time
+from typing import Literal
+
+from sqlalchemy import DateTime, and_, cast, delete, func, literal, literal_column, or_, true, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, select
+
+from customer.models.customer import Customer
+from menu.models.menu_category import MenuCategory
+from menu.models.menu_item import MenuItem
+from menu.models.menu_subcategory import MenuSubCategory
+from service_flow.diningtable.models.dining_table import DiningTable
+from service_flow.order.models.order import Order, OrderStatus
+from service_flow.orderitem.models.order_item import OrderItem
+from service_flow.tablesession.models.table_session import TableSession
+from statistics.models.stat import DailyItemSales, DailyRevenue
+
+ROLLUP_COLUMNS = ["day", "revenue", "sessions", "orders", "items"]
+ITEM_SALES_COLUMNS = ["day", "menu_item_id", "quantity", "revenue"]
+
+# Days, hours and weeks are the restaurant's, not UTC's. Changing it moves
+# sessions between days: rebuild the rollup (scripts.rebuild_daily_revenue).
+RESTAURANT_TIMEZONE = os.getenv("RESTAURANT_TIMEZONE", "UTC")
+
+Granularity = Literal["hour", "day", "week", "month"]
+ItemSalesGroup = Literal["item", "category", "subcategory"]
+ItemSalesSort = Literal["quantity", "revenue"]
+SortDirection = Literal["top", "bottom"]
+KitchenGroup = Literal["hour", "table_type", "category"]
+TableGroup = Literal["table_type", "table"]
+
+TICKET_PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def local_time(column):
+    """Wall-clock time at the restaurant for a timestamptz column"""
+    return func.timezone(RESTAURANT_TIMEZONE, column)
+
+
+def local_day(column):
+    return func.date(local_time(column))
+
+
+ONE_HOUR = literal_column("interval '1 hour'")
+
+
+def local_midnight(day: date):
+    return func.timezone(RESTAURANT_TIMEZONE, datetime.combine(day, time()))
+
+
+def closed_between(start: date, end: date):
+    """Sessions closed on the local days [start, end); compares ended_at itself so the index applies"""
+    return [
+        col(TableSession.ended_at) >= local_midnight(start),
+        col(TableSession.ended_at) < local_midnight(end),
+    ]
+
+
+def daily_revenue_statement(start: datetime, end: datetime):
+    # One rollup row per day instead of grouping every closed session
+    return (
+        select(
+            col(DailyRevenue.day).label('date'),
+            DailyRevenue.revenue,
+            DailyRevenue.sessions,
+            DailyRevenue.orders,
+            DailyRevenue.items,
+        )
+        .where(
+            col(DailyRevenue.day) >= start.date(),
+            col(DailyRevenue.day) < end.date(),
+            col(DailyRevenue.sessions) > 0,
+        )
+        .order_by(col(DailyRevenue.day))
+    )
+
+
+def _upsert_rollup(model, columns: list[str], keys: list[str], source):
+    """Insert ``source`` into a rollup, adding to the counters of rows that already exist"""
+    statement = insert(model).from_select(columns, source)
+    return statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={
+            name: getattr(model, name) + statement.excluded[name]
+            for name in columns
+            if name not in keys
+        },
+    )
+
+
+def record_session_revenue_statement(session_id: int, sign: int = 1):
+    """
+    Add a closed session to its day's rollup, or take it out again with
+    ``sign=-1``. Runs in the transaction that closes (or deletes) the session.
+    """
+    orders = (
+        select(func.count(Order.id))  # type: ignore
+        .where(col(Order.session_id) == TableSession.id)
+        .scalar_subquery()
+    )
+    items = (
+        select(func.coalesce(func.sum(OrderItem.quantity), 0))
+        .join(Order, col(Order.id) == OrderItem.order_id)
+        .where(col(Order.session_id) == TableSession.id)
+        .scalar_subquery()
+    )
+    source = (
+        select(
+            local_day(TableSession.ended_at),
+            func.coalesce(TableSession.final_bill, 0) * sign,
+            literal(sign),
+            orders * sign,
+            items * sign,
+        )
+        .where(
+            col(TableSession.id) == session_id,
+            col(TableSession.ended_at).is_not(None),
+        )
+    )
+    return _upsert_rollup(DailyRevenue, ROLLUP_COLUMNS, ["day"], source)
+
+
+def record_session_item_sales_statement(session_id: int, sign: int = 1):
+    """Add (or with ``sign=-1`` remove) a closed session's lines to the item-sales rollup"""
+    day = local_day(TableSession.ended_at)
+    source = (
+        select(
+            day,
+            OrderItem.menu_item_id,
+            func.sum(OrderItem.quantity) * sign,
+            func.sum(OrderItem.price_at_time * OrderItem.quantity) * sign,
+        )
+        .join(Order, col(Order.id) == OrderItem.order_id)
+        .join(TableSession, col(TableSession.id) == Order.session_id)
+        .where(
+            col(TableSession.id) == session_id,
+            col(TableSession.ended_at).is_not(None),
+        )
+        .group_by(day, col(OrderItem.menu_item_id))
+    )
+    return _upsert_rollup(DailyItemSales, ITEM_SALES_COLUMNS, ["day", "menu_item_id"], source)
+
+
+def session_rollup_statements(session_id: int, sign: int = 1):
+    """Every rollup change for closing (``sign=1``) or deleting (``sign=-1``) a closed session"""
+    return [
+        record_session_revenue_statement(session_id, sign),
+        record_session_item_sales_statement(session_id, sign),
+    ]
+
+
+def revenue_buckets_statement(start: date, end: date, granularity: Granularity):
+    """
+    Revenue and sessions per local hour, day, week or month in [start, end).
+    Days and up add up rollup rows; hours group the closed sessions.
+    """
+    if granularity == "hour":
+        bucket = func.date_trunc("hour", local_time(TableSession.ended_at))
+        return (
+            select(
+                bucket.label("start"),
+                func.sum(func.coalesce(TableSession.final_bill, 0)).label("revenue"),
+                func.count(TableSession.id).label("sessions"),  # type: ignore
+            )
+            .where(*closed_between(start, end))
+            .group_by(bucket)
+            .order_by(bucket)
+        )
+
+    # A date would be truncated as a timestamptz; keep buckets in local time
+    bucket = func.date_trunc(granularity, cast(DailyRevenue.day, DateTime))
+    return (
+        select(
+            bucket.label("start"),
+            func.sum(DailyRevenue.revenue).label("revenue"),
+            func.sum(DailyRevenue.sessions).label("sessions"),
+        )
+        .where(
+            col(DailyRevenue.day) >= start,
+            col(DailyRevenue.day) < end,
+            col(DailyRevenue.sessions) > 0,
+        )
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+
+
+def revenue_heatmap_statement(start: date, end: date):
+    """Revenue and sessions per local ISO weekday (1 = Monday) and hour of day"""
+    weekday = func.extract("isodow", local_time(TableSession.ended_at))
+    hour = func.extract("hour", local_time(TableSession.ended_at))
+    return (
+        select(
+            weekday.label("day_of_week"),
+            hour.label("hour"),
+            func.sum(func.coalesce(TableSession.final_bill, 0)).label("revenue"),
+            func.count(TableSession.id).label("sessions"),  # type: ignore
+        )
+        .where(*closed_between(start, end))
+        .group_by(weekday, hour)
+        .order_by(weekday, hour)
+    )
+
+
+def _rebuild_ranges(model, start: date | None, end: date | None):
+    """Closed sessions and rollup rows of the local days [start, end)"""
+    sessions_in_range = [col(TableSession.ended_at).is_not(None)]
+    rollup_in_range = []
+    if start is not None:
+        sessions_in_range.append(col(TableSession.ended_at) >= local_midnight(start))
+        rollup_in_range.append(col(model.day) >= start)
+    if end is not None:
+        sessions_in_range.append(col(TableSession.ended_at) < local_midnight(end))
+        rollup_in_range.append(col(model.day) < end)
+    return sessions_in_range, rollup_in_range
+
+
+def rebuild_daily_revenue_statements(start: date | None = None, end: date | None = None):
+    """Delete and recompute the rollup for [start, end) from the sessions; both open-ended by default"""
+    day = local_day(TableSession.ended_at)
+    in_range, rollup_in_range = _rebuild_ranges(DailyRevenue, start, end)
+
+    orders = (
+        select(Order.session_id, func.count(Order.id).label("order_count"))  # type: ignore
+        .group_by(col(Order.session_id))
+        .subquery()
+    )
+    items = (
+        select(Order.session_id, func.sum(OrderItem.quantity).label("item_count"))
+        .join(Order, col(Order.id) == OrderItem.order_id)
+        .group_by(col(Order.session_id))
+        .subquery()
+    )
+    source = (
+        select(
+            day,
+            func.sum(func.coalesce(TableSession.final_bill, 0)),
+            func.count(TableSession.id),  # type: ignore
+            func.sum(func.coalesce(orders.c.order_count, 0)),
+            func.sum(func.coalesce(items.c.item_count, 0)),
+        )
+        .outerjoin(orders, orders.c.session_id == TableSession.id)
+        .outerjoin(items, items.c.session_id == TableSession.id)
+        .where(*in_range)
+        .group_by(day)
+    )
+    return [
+        delete(DailyRevenue).where(*rollup_in_range),
+        insert(DailyRevenue).from_select(ROLLUP_COLUMNS, source),
+    ]
+
+
+def rebuild_item_sales_statements(start: date | None = None, end: date | None = None):
+    """Same as rebuild_daily_revenue_statements, for the item-sales rollup"""
+    day = local_day(TableSession.ended_at)
+    in_range, rollup_in_range = _rebuild_ranges(DailyItemSales, start, end)
+    source = (
+        select(
+            day,
+            OrderItem.menu_item_id,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.price_at_time * OrderItem.quantity),
+        )
+        .join(Order, col(Order.id) == OrderItem.order_id)
+        .join(TableSession, col(TableSession.id) == Order.session_id)
+        .where(*in_range)
+        .group_by(day, col(OrderItem.menu_item_id))
+    )
+    return [
+        delete(DailyItemSales).where(*rollup_in_range),
+        insert(DailyItemSales).from_select(ITEM_SALES_COLUMNS, source),
+    ]
+
+
+def item_sales_statement(
+    start: date,
+    end: date,
+    group: ItemSalesGroup,
+    sort_by: ItemSalesSort,
+    direction: SortDirection,
+    limit: int | None,
+):
+    """
+    Quantity and revenue per menu item, category or subcategory over the
+    local days [start, end), best (``top``) or worst (``bottom``) first.
+    Everything on the menu is listed, so unsold items rank at the bottom.
+    """
+    sales = (
+        select(
+            DailyItemSales.menu_item_id,
+            func.sum(DailyItemSales.quantity).label("quantity"),
+            func.sum(DailyItemSales.revenue).label("revenue"),
+        )
+        .where(col(DailyItemSales.day) >= start, col(DailyItemSales.day) < end)
+        .group_by(col(DailyItemSales.menu_item_id))
+        .subquery()
+    )
+    quantity = func.coalesce(func.sum(sales.c.quantity), 0).label("quantity")
+    revenue = func.coalesce(func.sum(sales.c.revenue), 0).label("revenue")
+
+    if group == "item":
+        dimension = MenuItem
+        statement = select(MenuItem.id, MenuItem.name, quantity, revenue)
+    elif group == "category":
+        dimension = MenuCategory
+        statement = (
+            select(MenuCategory.id, MenuCategory.name, quantity, revenue)
+            .outerjoin(MenuItem, col(MenuItem.category_id) == MenuCategory.id)
+        )
+    else:
+        dimension = MenuSubCategory
+        statement = (
+            select(MenuSubCategory.id, MenuSubCategory.name, quantity, revenue)
+            .outerjoin(MenuItem, col(MenuItem.sub_category_id) == MenuSubCategory.id)
+        )
+
+    ranked_by = quantity if sort_by == "quantity" else revenue
+    statement = (
+        statement
+        .outerjoin(sales, sales.c.menu_item_id == MenuItem.id)
+        .group_by(col(dimension.id), col(dimension.name))
+        .order_by(
+            ranked_by.desc() if direction == "top" else ranked_by.asc(),
+            col(dimension.id),
+        )
+    )
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def ticket_times_statement(start: date, end: date, group: KitchenGroup):
+    """
+    Ticket time percentiles, in seconds from placing an order to serving it,
+    for the orders served on the local days [start, end). Grouped by the
+    local hour the order was placed, the table's type (none once the table
+    is deleted) or menu category; an order with lines from several
+    categories counts once in each.
+
+    Only orders that are served now count: one taken back to pending drops
+    out, and once served again it is timed to that last serve. The range
+    walks ix_order_served_queue, and each order in it looks up its table or
+    lines by key, so the cost follows the range and not the history.
+    """
+    seconds = func.extract("epoch", col(Order.served_at) - col(Order.created_at))
+    tickets = select(col(Order.id).label("order_id"), seconds.label("seconds"))
+
+    if group == "hour":
+        tickets = tickets.add_columns(func.extract("hour", local_time(Order.created_at)).label("key"))
+    elif group == "table_type":
+        table_type = (
+            select(DiningTable.type)
+            .join(TableSession, col(TableSession.table_id) == DiningTable.id)
+            .where(col(TableSession.id) == Order.session_id)
+            .scalar_subquery()
+        )
+        tickets = tickets.add_columns(table_type.label("key"))
+    else:
+        categories = (
+            select(col(MenuItem.category_id).label("key"))
+            .join(OrderItem, col(OrderItem.menu_item_id) == MenuItem.id)
+            .where(col(OrderItem.order_id) == Order.id)
+            .distinct()
+            .lateral()
+        )
+        tickets = tickets.add_columns(categories.c.key).join(categories, literal(True))
+
+    tickets = tickets.where(
+        col(Order.status) == OrderStatus.SERVED,
+        col(Order.served_at) >= local_midnight(start),
+        col(Order.served_at) < local_midnight(end),
+    ).subquery()
+
+    statement = select(
+        tickets.c.key,
+        func.count(tickets.c.order_id).label("orders"),
+        *(
+            func.percentile_cont(fraction).within_group(tickets.c.seconds).label(name)
+            for name, fraction in TICKET_PERCENTILES.items()
+        ),
+    )
+    if group == "category":
+        # Named per group, after aggregating
+        name = select(MenuCategory.name).where(col(MenuCategory.id) == tickets.c.key).scalar_subquery()
+        statement = statement.add_columns(name.label("name"))
+    return statement.group_by(tickets.c.key).order_by(tickets.c.key)
+
+
+def table_turnover_statement(start: date, end: date, group: TableGroup):
+    """
+    Closed sessions, average dwell (seated to closed) and turns per table
+    per day over the local days [start, end), per table type or per table.
+    Idle tables count towards the turns; sessions of deleted tables don't.
+    """
+    per_table = (
+        select(
+            TableSession.table_id,
+            func.count(TableSession.id).label("sessions"),  # type: ignore
+            func.sum(
+                func.extract("epoch", col(TableSession.ended_at) - col(TableSession.started_at))
+            ).label("dwell_seconds"),
+        )
+        .where(*closed_between(start, end))
+        .group_by(col(TableSession.table_id))
+        .subquery()
+    )
+    tables = func.count(DiningTable.id)  # type: ignore
+    sessions = func.coalesce(func.sum(per_table.c.sessions), 0)
+    keys = [col(DiningTable.type)] if group == "table_type" else [col(DiningTable.number), col(DiningTable.type)]
+    return (
+        select(
+            *keys,
+            tables.label("tables"),
+            sessions.label("sessions"),
+            (func.sum(per_table.c.dwell_seconds) / func.nullif(sessions, 0)).label("average_dwell_seconds"),
+            (sessions / (tables * (end - start).days)).label("turns_per_table_per_day"),
+        )
+        .outerjoin(per_table, per_table.c.table_id == DiningTable.id)
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+
+
+def occupancy_statement(start: date, end: date):
+    """
+    Share of table time occupied per local hour of day and table type over
+    the local days [start, end), up to now; open sessions count as seated
+    until now. Each stay is cut into the clock hours it overlaps, so a
+    session from 19:40 to 21:10 adds 20, 60 and 10 minutes. Capacity is the
+    current tables of the type times the hours that have passed.
+    """
+    range_start = local_midnight(start)
+    range_end = func.least(local_midnight(end), func.now())
+
+    stays = (
+        select(
+            col(DiningTable.type).label("table_type"),
+            local_time(func.greatest(TableSession.started_at, range_start)).label("starts"),
+            local_time(
+                func.least(func.coalesce(TableSession.ended_at, func.now()), range_end)
+            ).label("ends"),
+        )
+        .join(DiningTable, col(DiningTable.id) == TableSession.table_id)
+        .where(
+            # Closed in or after the range (history index) or still open
+            or_(col(TableSession.ended_at) >= range_start, col(TableSession.ended_at).is_(None)),
+            col(TableSession.started_at) < range_end,
+        )
+        .subquery()
+    )
+    hours = (
+        func.generate_series(func.date_trunc("hour", stays.c.starts), stays.c.ends, ONE_HOUR)
+        .table_valued("start")
+        .render_derived(name="hours")
+        .lateral()
+    )
+    overlap = func.least(stays.c.ends, hours.c.start + ONE_HOUR) - func.greatest(stays.c.starts, hours.c.start)
+    hour_of_day = func.extract("hour", hours.c.start)
+    occupied = (
+        select(
+            stays.c.table_type,
+            hour_of_day.label("hour"),
+            func.sum(func.extract("epoch", overlap)).label("seconds"),
+        )
+        .select_from(stays)
+        .join(hours, true())
+        .group_by(stays.c.table_type, hour_of_day)
+        .subquery()
+    )
+
+    # Hours that have started in the range; the current one counts in full
+    slot = func.generate_series(
+        local_time(range_start),
+        local_time(range_end) - literal_column("interval '1 microsecond'"),
+        ONE_HOUR,
+    ).column_valued("slot")
+    available = (
+        select(func.extract("hour", slot).label("hour"), func.count().label("hours"))
+        .group_by(func.extract("hour", slot))
+        .subquery()
+    )
+    tables = (
+        select(col(DiningTable.type).label("table_type"), func.count(DiningTable.id).label("tables"))  # type: ignore
+        .group_by(col(DiningTable.type))
+        .subquery()
+    )
+    capacity_seconds = tables.c.tables * available.c.hours * 3600
+    return (
+        select(
+            available.c.hour,
+            tables.c.table_type,
+            tables.c.tables,
+            (100 * func.coalesce(occupied.c.seconds, 0) / capacity_seconds).label("occupancy_percent"),
+        )
+        .select_from(available)
+        .join(tables, true())
+        .outerjoin(
+            occupied,
+            and_(occupied.c.hour == available.c.hour, occupied.c.table_type == tables.c.table_type),
+        )
+        .order_by(available.c.hour, tables.c.table_type)
+    )
+
+
+def live_occupancy_statement():
+    """Tables and occupied tables per type right now, from the open-session index"""
+    return (
+        select(
+            DiningTable.type,
+            func.count(DiningTable.id).label("tables"),  # type: ignore
+            func.count(TableSession.id).label("occupied"),  # type: ignore
+        )
+        .outerjoin(
+            TableSession,
+            (col(TableSession.table_id) == DiningTable.id)
+            & col(TableSession.ended_at).is_(None),
+        )
+        .group_by(col(DiningTable.type))
+        .order_by(col(DiningTable.type))
+    )
+
+
+def sales_facts_statement(after: tuple[datetime, int] | None, until: datetime):
+    """
+    One row per item line of the sessions closed after the ``(ended_at, id)``
+    watermark and before ``until``, in close order, with the session, order,
+    menu and customer columns alongside and the local month it closed in.
+    Sessions without lines have no facts.
+    """
+    statement = (
+        select(
+            func.to_char(local_time(TableSession.ended_at), "YYYY-MM").label("month"),
+            col(TableSession.id).label("session_id"),
+            TableSession.table_id,
+            col(DiningTable.type).label("table_type"),
+            TableSession.customer_id,
+            col(Customer.name).label("customer_name"),
+            col(TableSession.started_at).label("session_started_at"),
+            col(TableSession.ended_at).label("session_ended_at"),
+            col(Order.id).label("order_id"),
+            col(Order.created_at).label("ordered_at"),
+            Order.served_at,
+            col(OrderItem.id).label("line_id"),
+            OrderItem.menu_item_id,
+            col(MenuItem.name).label("item_name"),
+            MenuItem.category_id,
+            col(MenuCategory.name).label("category_name"),
+            OrderItem.quantity,
+            OrderItem.price_at_time,
+            (OrderItem.price_at_time * OrderItem.quantity).label("line_total"),
+        )
+        .join(Order, col(Order.session_id) == TableSession.id)
+        .join(OrderItem, col(OrderItem.order_id) == Order.id)
+        .outerjoin(MenuItem, col(MenuItem.id) == OrderItem.menu_item_id)
+        .outerjoin(MenuCategory, col(MenuCategory.id) == MenuItem.category_id)
+        .outerjoin(Customer, col(Customer.id) == TableSession.customer_id)
+        .outerjoin(DiningTable, col(DiningTable.id) == TableSession.table_id)
+        .where(
+            col(TableSession.ended_at).is_not(None),
+            col(TableSession.ended_at) < until,
+        )
+        .order_by(
+            col(TableSession.ended_at),
+            col(TableSession.id),
+            col(Order.id),
+            col(OrderItem.id),
+        )
+    )
+    if after is not None:
+        statement = statement.where(tuple_(TableSession.ended_at, TableSession.id) > tuple_(*after))
+    return statement
@@ -1,5 +1,6 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 
 from database import get_session
@@ -7,11 +8,12 @@ from database import get_session
 from user.models.user import User
 from user.schemas.user import UserCreate, UserPublic
 from user.services.user_service import create_user, get_user_by_email, get_active_users, get_user_by_id
-from auth.services.auth_service import get_current_active_user
+from auth.utils.auth_utils import get_password_hash_async
+from auth.services.auth_service import get_current_active_user, get_current_user_profile
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 @router.get(
     "/",
@@ -26,16 +28,21 @@ def read_users(session: SessionDep):
     response_model=UserPublic,
     status_code=201
 )
-def signup(user_in: UserCreate, session: SessionDep):
-    if get_user_by_email(session, user_in.email):
+async def signup(user_in: UserCreate, session: SessionDep):
+    if await run_in_threadpool(get_user_by_email, session, user_in.email):
         raise HTTPException(
             status_code=400,
             detail="Email already exists"
         )
 
-    return create_user(
+    await run_in_threadpool(session.close)
+    password_hash = await get_password_hash_async(user_in.password)
+
+    return await run_in_threadpool(
+        create_user,
         session,
-        user_in
+        user_in,
+        password_hash
     )
 
 @router.get(
@@ -43,7 +50,7 @@ def signup(user_in: UserCreate, session: SessionDep):
     response_model=UserPublic
 )
 def read_me(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user_profile),
 ):
     return current_user
 
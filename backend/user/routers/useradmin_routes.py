@@ -7,10 +7,11 @@ from database import get_session
 from user.schemas.user import UserAdmin, UserUpdate
 from user.services.user_service import get_users, get_user_by_id, update_user, delete_user_hard
 from auth.services.auth_service import get_current_active_user, require_admin
+from auth.utils.user_cache import get_user_cache_stats
 
 router = APIRouter(prefix="/admin/users", tags=["users"])
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
 
 @router.get(
     "",
@@ -20,6 +21,13 @@ SessionDep = Annotated[Session, Depends(get_session)]
 def read_users(session: SessionDep):
     return get_users(session)
 
+@router.get(
+    "/cache-stats",
+    dependencies=[Depends(require_admin)]
+)
+def read_user_cache_stats():
+    return get_user_cache_stats()
+
 @router.patch(
     "/{user_id}",
     response_model=UserAdmin,
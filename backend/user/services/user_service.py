@@ -5,13 +5,20 @@ from sqlalchemy.exc import IntegrityError
 from pydantic import EmailStr, ValidationError, TypeAdapter
 from fastapi import HTTPException
 
+from database import commit_or_flush, run_after_commit
 from user.models.user import User
 from auth.utils.auth_utils import get_password_hash
+from auth.utils.user_cache import invalidate_user
+from auth.utils.token_revocation import revoke_user_tokens
 from user.schemas.user import UserCreate, UserUpdate
 
 email_adapter = TypeAdapter(EmailStr)
 
-def create_user(session: Session, data: UserCreate) -> User:
+def create_user(
+    session: Session,
+    data: UserCreate,
+    password_hash: str | None = None,
+) -> User:
     # 1. validate + normalize email
     try:
         email = email_adapter.validate_python(data.email).lower()
@@ -32,19 +39,18 @@ def create_user(session: Session, data: UserCreate) -> User:
         first_name=data.first_name,
         middle_name=data.middle_name,
         last_name=data.last_name,
-        password_hash=get_password_hash(data.password),
+        password_hash=password_hash or get_password_hash(data.password),
     )
 
     session.add(user)
 
     # 4. final DB-level protection
     try:
-        session.commit()
+        commit_or_flush(session)
     except IntegrityError:
         session.rollback()
         raise ValueError("Email already registered")
 
-    session.refresh(user)
     return user
 
 def get_users(session: Session):
@@ -73,18 +79,32 @@ def update_user(
     data: UserUpdate
 ) -> User:
     data_dict = data.model_dump(exclude_unset=True)
+    email, user_id = user.email, user.id
 
     for key, value in data_dict.items():
         setattr(user, key, value)
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    run_after_commit(session, lambda: invalidate_user(email))
+    if "role" in data_dict or "is_active" in data_dict:
+        run_after_commit(session, lambda: revoke_user_tokens(user_id))  # type: ignore
+    commit_or_flush(session)
+    return user
+    
+def update_password_hash(session: Session, user: User, password_hash: str) -> User:
+    email = user.email
+    user.password_hash = password_hash
+    session.add(user)
+    run_after_commit(session, lambda: invalidate_user(email))
+    commit_or_flush(session)
     return user
     
 def delete_user_hard(session: Session, user: User):
+    email, user_id = user.email, user.id
     session.delete(user)
-    session.commit()
+    run_after_commit(session, lambda: invalidate_user(email))
+    run_after_commit(session, lambda: revoke_user_tokens(user_id))  # type: ignore
+    commit_or_flush(session)
 
 
 